@@ -5,7 +5,6 @@ import time
 import sys
 import warnings
 import logging
-import pickle
 
 # --- Suppress TensorFlow and related logs ---
 os.environ['TF_ENABLE_ONEDNN_OPTS'] = '0'
@@ -31,6 +30,8 @@ from sklearn.preprocessing import StandardScaler
 from backend_modules.blink_detector import BlinkDetector
 from backend_modules.user_manager import UserManager
 from backend_modules.classifier import BlinkClassifier
+from backend_modules.mlp_engine import NumpyMLP
+from backend_modules.model_artifact import MODEL_SUFFIX, write_model_artifact
 
 class TrainableClassifier(BlinkClassifier):
     """
@@ -100,18 +101,18 @@ class TrainableClassifier(BlinkClassifier):
             self.model = None
             return 0, 0.5
 
-    def save_model(self, filepath):
+    def save_model(self, filepath, pause_timing=None):
         try:
+            engine = None
             if self.model: 
+                # Keras source model, kept for inspection and retraining tools
                 self.model.save(f"{filepath}_model.h5")
-            
-            model_data = {
-                'scaler': self.scaler, 
-                'dot_threshold': self.dot_threshold, 
-                'has_model': self.model is not None
-            }
-            with open(f"{filepath}_data.pkl", 'wb') as f: 
-                pickle.dump(model_data, f)
+                # NumPy copy of the weights so the server never needs TensorFlow
+                engine = NumpyMLP.from_keras(self.model, self.scaler)
+
+            # Everything the server loads, in one memory-mappable file (no pickle)
+            write_model_artifact(f"{filepath}{MODEL_SUFFIX}", self.dot_threshold,
+                                 self.scaler.mean_, self.scaler.scale_, engine, pause_timing)
             print(f"Model and scaler saved to {filepath}")
         except Exception as e: 
             print(f"Error saving model: {e}")
@@ -164,7 +165,7 @@ class UserTrainer:
                 
                 if loss is not None and accuracy is not None and accuracy > 0.5:
                     # Save the trained model to the user's directory
-                    self.classifier.save_model(user_info['model_path'])
+                    self.classifier.save_model(os.path.normpath(user_info['model_path']), user_info.get('pause_timing'))
                     self.user_manager.mark_user_trained(username)
 
                     print(f"Training completed successfully! Accuracy: {accuracy:.2%}")
@@ -280,11 +281,10 @@ def main_train():
         choice = input("\nEnter your choice (1-4): ").strip()
 
         if choice == '1':
-            users = user_manager.list_users()
+            users = user_manager.user_summaries()
             if users:
                 print("\nExisting users:")
-                for i, user in enumerate(users, 1):
-                    info = user_manager.get_user(user)
+                for i, (user, info) in enumerate(users.items(), 1):
                     status = "Trained" if info['trained'] else "Not trained"
                     print(f"{i}. {user} ({status})")
             else:
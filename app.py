@@ -2,16 +2,29 @@ import os
 import sys
 import threading
 import time
+from datetime import datetime
 
-from flask import Flask, render_template, jsonify, request
+_import_start = time.perf_counter()
+
+from flask import Flask, render_template, jsonify, request, Response
 from flask_socketio import SocketIO, emit
-import numpy as np
-import base64
-import cv2
 
 # Import our new modular backend components
 from backend_modules.user_manager import UserManager
-from backend_modules.communicator import MorseCodeCommunicator
+from backend_modules.session_manager import SessionManager
+from backend_modules.model_cache import ClassifierCache
+from backend_modules.frame_codec import decode_data_url, FrameDecodeError
+from backend_modules.session_recorder import SessionRecorder
+from backend_modules.metrics import MetricsRegistry, render_prometheus
+from backend_modules.backends import backends
+from backend_modules.blink_detector import BlinkDetector, DETECTOR_BACKENDS, VISION_BACKENDS
+from backend_modules.ui_channel import ui_fields
+from backend_modules.pipeline import process_frame, decode_pending
+from backend_modules.vision_pool import VisionPool
+
+# dlib, MediaPipe and scikit-learn are not imported here; they load in a
+# background warm-up thread once the server is up (see /ready)
+print(f"Server modules imported in {time.perf_counter() - _import_start:.2f}s")
 
 # --- Configuration ---
 app = Flask(__name__, template_folder='.', static_folder='.', static_url_path='/')
@@ -22,17 +35,79 @@ socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading', max_h
 
 # Global Instances
 user_manager = UserManager()
-communicator = MorseCodeCommunicator()
-communicator.user_manager = user_manager
+# Face tracking: full-frame detection every N frames and/or when tracking confidence drops
+detector_options = {
+    'redetect_policy': BlinkDetector.parse_redetect_policy(os.environ.get('SILENTVOICE_REDETECT_POLICY', 'hybrid')),
+    'redetect_interval': int(os.environ.get('SILENTVOICE_REDETECT_INTERVAL', 10)),
+    # HOG detection on a downscaled frame: 'auto' (from recent face size) or a fixed factor
+    'detection_scale': BlinkDetector.parse_detection_scale(os.environ.get('SILENTVOICE_DETECTION_SCALE', 'auto')),
+}
+
+# Loaded classifiers shared across sessions; switching users doesn't reload from disk
+classifier_cache = ClassifierCache(
+    max_entries=int(os.environ.get('SILENTVOICE_MODEL_CACHE_SIZE', 16)),
+    max_bytes=int(os.environ.get('SILENTVOICE_MODEL_CACHE_MB', 64)) * 1024 * 1024)
+user_manager.add_listener(classifier_cache.invalidate)
+
+# Most recently used profiles are loaded by the warm-up thread (0 disables)
+PRELOAD_USERS = int(os.environ.get('SILENTVOICE_PRELOAD_USERS', 3))
+if PRELOAD_USERS:
+    backends.register('recent_user_models', lambda: classifier_cache.preload(user_manager, PRELOAD_USERS),
+                      depends=('sklearn',))
+
+# Server-wide stage timings and frame counters (/metrics); SILENTVOICE_METRICS=0 disables them.
+# Series are labelled scope="global" or scope="session" (the totals include every session, so sum one scope)
+metrics = MetricsRegistry({'scope': 'global'}, enabled=os.environ.get('SILENTVOICE_METRICS', '1') != '0')
 
-# Global processing state
-processing_thread = None
+# Blink detection in N worker processes instead of the server process (0 keeps it in-process)
+VISION_PROCESSES = int(os.environ.get('SILENTVOICE_VISION_PROCESSES', 0))
+vision_pool = VisionPool(VISION_PROCESSES, detector_options) if VISION_PROCESSES else None
+
+# Each connected client gets its own session (detector, Morse buffers, classifier)
+session_manager = SessionManager(user_manager, max_workers=int(os.environ.get('SILENTVOICE_WORKERS', 0)) or None,
+                                 detector_options=detector_options, metrics=metrics, vision_pool=vision_pool)
+
+# Dispatcher that hands active sessions to the worker pool
+dispatcher_thread = None
 thread_lock = threading.Lock()
-processing_active = False
-current_frame = None
+# How often pending letters/spaces are checked when no frames arrive (seconds)
+DECODE_TICK = 0.1
+
+# When set, every stream's incoming frames are recorded here for offline replay
+# (see benchmarks/replay.py)
+RECORD_DIR = os.environ.get('SILENTVOICE_RECORD_DIR')
+
+def warm_up_backends():
+    """
+    Starts loading backends in the serving process (only the first call does
+    anything). With a vision pool, dlib and MediaPipe load in the workers
+    instead, so the server process never imports them.
+    """
+    if vision_pool:
+        vision_pool.start()
+        backends.warm_up(exclude=VISION_BACKENDS)
+    else:
+        backends.warm_up()
+
+def detector_settled():
+    """True once face detection has loaded or failed to, so frames can be processed."""
+    if vision_pool:
+        return vision_pool.is_settled()
+    return backends.is_settled(*DETECTOR_BACKENDS)
+
+def detector_ready():
+    if vision_pool:
+        return vision_pool.is_ready()
+    return backends.is_ready(*DETECTOR_BACKENDS)
 
 # --- Routes ---
 
+@app.before_request
+def start_warm_up():
+    # Backends load once the serving process gets its first request, whatever started it
+    # (debug reloader child, no reloader, or a WSGI host importing this module)
+    warm_up_backends()
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -62,13 +137,42 @@ def flappy_bird():
 @app.route('/users')
 def list_users_api():
     """API endpoint to list all users."""
-    users = user_manager.list_users()
-    user_data = {}
-    for u in users:
-        info = user_manager.get_user(u)
-        # Safely access 'trained' key
-        user_data[u] = {'trained': info.get('trained', False) if info else False}
-    return jsonify(user_data)
+    return jsonify(user_manager.user_summaries())
+
+# --- Monitoring ---
+
+@app.route('/ready')
+def ready():
+    """Readiness probe: 200 once the face detector is warm, 503 while backends are still loading."""
+    is_ready = detector_ready()
+    return jsonify({'ready': is_ready, 'backends': backends.status()}), (200 if is_ready else 503)
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus text exposition of stage latencies, fps, queue depth and frame counters."""
+    return Response(metrics_text(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+def metrics_text():
+    sessions = session_manager.all_sessions()
+    metrics.set_gauge('sessions', len(sessions))
+    metrics.set_gauge('active_sessions', sum(1 for s in sessions if s.processing_active))
+    metrics.set_gauge('queue_depth', session_manager.queue_depth())
+    for key, value in classifier_cache.stats().items():
+        metrics.set_gauge(f'classifier_cache_{key}', value)
+    for session in sessions:
+        session.metrics.set_gauge('pending_frames', int(session.has_pending_frame()))
+        tracking = session.communicator.blink_detector.get_tracking_stats()
+        for key in ('detections_performed', 'roi_detections', 'detections_skipped'):
+            session.metrics.set_gauge(f'face_{key}', tracking[key])
+        session.metrics.set_gauge('letter_pause_seconds', session.communicator.LETTER_PAUSE)
+        session.metrics.set_gauge('space_pause_seconds', session.communicator.SPACE_PAUSE)
+        backend_stats = session.communicator.blink_detector.get_backend_stats()
+        session.metrics.set_gauge('face_frames_skipped', backend_stats['frames_skipped'])
+        session.metrics.set_gauge('face_backend_switches', backend_stats['switches'])
+        for name, stats in backend_stats['backends'].items():
+            for key in ('attempts', 'successes'):
+                session.metrics.set_gauge(f'face_backend_{name}_{key}', stats[key])
+    return render_prometheus([metrics] + [s.metrics for s in sessions])
 
 @app.route('/create_user/<username>')
 def create_user_api(username):
@@ -81,13 +185,28 @@ def create_user_api(username):
 @socketio.on('connect')
 def handle_connect():
     print(f'Client connected: {request.sid}')
+    warm_up_backends()
+    session_manager.get_or_create(request.sid)
 
 @socketio.on('disconnect')
 def handle_disconnect():
     print(f'Client disconnected: {request.sid}')
-    # Stop processing if the controlling client disconnects
-    global processing_active
-    processing_active = False
+    session = session_manager.get(request.sid)
+    if session:
+        save_user_learning(session)
+    # Only this client's session is torn down; other clients keep running
+    session_manager.remove(request.sid)
+
+def save_user_learning(session):
+    """Persists the pause timings and word history learned during the session with the user's profile."""
+    communicator = session.communicator
+    if communicator.current_user:
+        profile = communicator.pause_timing_profile()
+        if profile:
+            user_manager.update_pause_timing(communicator.current_user, profile)
+        history = communicator.word_history_profile()
+        if history:
+            user_manager.update_word_history(communicator.current_user, history)
 
 @socketio.on('select_user')
 def handle_select_user(data):
@@ -97,11 +216,17 @@ def handle_select_user(data):
     if not user_info:
         return {'status': 'error', 'message': 'User not found'}
     
-    # Store current user in communicator
+    # Store current user in this client's communicator
+    session = session_manager.get_or_create(request.sid)
+    # Keep what was learned for the previous user before it is replaced
+    save_user_learning(session)
+    communicator = session.communicator
     communicator.current_user = username
     
-    # Try to load their trained model
-    if communicator.load_user_profile(user_info):
+    user_manager.touch_user(username)
+    
+    # Try to load their trained model (from the cache when possible)
+    if communicator.load_user_profile(user_info, classifier_cache):
         return {'status': 'success', 'message': f"User {username} loaded"}
     else:
         # Allow selection even if not trained, but warn
@@ -112,20 +237,43 @@ def set_mode(data):
     mode = data.get('mode')
     print(f"Mode switched to: {mode}")
     if mode == 'idle':
-        communicator.reset_state()
+        session = session_manager.get_or_create(request.sid)
+        session.communicator.reset_state()
+        flush_ui(session)
+
+@socketio.on('ui_resync')
+def handle_ui_resync():
+    """The client missed an update: send the full UI state."""
+    session = session_manager.get(request.sid)
+    if session:
+        session.ui.resync()
+        flush_ui(session)
 
 @socketio.on('start_stream')
 def start_stream():
-    global processing_active, processing_thread
-    if not processing_active:
-        processing_active = True
-        processing_thread = socketio.start_background_task(process_frames, request.sid)
+    global dispatcher_thread
+    session = session_manager.get_or_create(request.sid)
+    if not session.processing_active:
+        # Fresh stream: drop face tracking and blink state from any earlier run
+        session.communicator.blink_detector.reset()
+        if RECORD_DIR and session.recorder is None:
+            name = f"{session.communicator.current_user or 'session'}_{datetime.now():%Y%m%d_%H%M%S}_{request.sid}.svrec"
+            session.recorder = SessionRecorder(os.path.join(RECORD_DIR, name))
+        session.processing_active = True
+        with thread_lock:
+            if dispatcher_thread is None:
+                dispatcher_thread = socketio.start_background_task(dispatch_sessions)
+        print(f"Processing started for SID: {request.sid}")
         emit('stream_started', {'message': 'Backend processing started'})
 
 @socketio.on('stop_stream')
 def stop_stream():
-    global processing_active
-    processing_active = False
+    session = session_manager.get(request.sid)
+    if session:
+        session.processing_active = False
+        print(f"Processing stopped for SID: {request.sid} frames: {session.get_frame_stats()}")
+        session.stop_recording()
+        save_user_learning(session)
     emit('stream_stopped', {'message': 'Backend processing stopped'})
 
 @socketio.on('send_quick_message')
@@ -139,77 +287,97 @@ def handle_room_command(data):
     device = data.get('device')
     action = data.get('action')
     # Call the communicator's hardware control method
+    communicator = session_manager.get_or_create(request.sid).communicator
     result = communicator.send_room_control(device, action)
     emit('status', {'message': result['message']})
 
+@socketio.on('get_stats')
+def handle_get_stats():
+    """Frame counters of this client's session (used by the load test)."""
+    session = session_manager.get(request.sid)
+    return session.get_frame_stats() if session else {}
+
 @socketio.on('frame')
 def handle_frame(data):
-    global current_frame
+    """Legacy transport: base64 JPEG data URL. Kept as a fallback for older clients."""
+    session = session_manager.get(request.sid)
+    if session is None:
+        return
     try:
-        # Decode base64 image
         if 'image' in data:
-            img_str = data['image']
-            if ',' in img_str:
-                img_str = img_str.split(',')[1]
-            img_bytes = base64.b64decode(img_str)
-            nparr = np.frombuffer(img_bytes, np.uint8)
-            frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-            current_frame = frame
+            with session.metrics.timer('decode'):
+                frame = decode_data_url(data['image'])
+            recorder = session.recorder
+            if frame is not None and recorder:
+                recorder.write_frame(frame)
+            if frame is not None and session.set_frame(frame):
+                wake_session(session)
     except Exception as e:
         # print(f"Frame decode error: {e}") # Optional logging
         pass
 
-def process_frames(sid):
-    """Background thread to process the latest frame."""
-    global processing_active, current_frame
-    
-    print(f"Background processing loop started for SID: {sid}")
+@socketio.on('frame_bin')
+def handle_frame_bin(packet):
+    """Binary transport: small header plus raw JPEG bytes or grayscale pixels."""
+    session = session_manager.get(request.sid)
+    if session is None:
+        return
+    try:
+        # Decoded straight into one of the session's frame buffers
+        with session.metrics.timer('decode'):
+            accepted = session.decode_packet(packet)
+        if accepted:
+            wake_session(session)
+    except FrameDecodeError as e:
+        print(f"[{request.sid}] Dropped frame: {e}")
+        session.drop_frame()
+
+def wake_session(session):
+    """Frame arrival schedules processing, so detection runs at the input frame rate."""
+    if session.processing_active:
+        session_manager.submit(session, process_frames)
+
+def dispatch_sessions():
+    """
+    Background loop for letter/space pauses, which must advance even while
+    no new frames arrive. Frames themselves are handled by wake_session.
+    """
+    print(f"Session dispatcher started ({session_manager.max_workers} workers)")
     
-    while processing_active:
-        socketio.sleep(0.02) # Yield to event loop (~50 FPS max)
+    while True:
+        socketio.sleep(DECODE_TICK)
         
-        if current_frame is None:
-            continue
-            
-        # Grab local reference to avoid race conditions during processing
-        frame = current_frame.copy()
-        
-        # 1. Detect Blink
-        blink_info, current_ear = communicator.blink_detector.detect_blink(frame)
-        
-        # 2. Logic Flow
-        if blink_info:
-            # Predict Dot vs Dash using the classifier
-            blink_type = communicator.classifier.predict(blink_info) # 'dot' or 'dash'
-            
-            print(f"Detected: {blink_type} ({blink_info['duration']:.2f}s)")
-
-            # Send Detection Event to Client (for Navigation/Game)
-            socketio.emit('blink_detected', {'type': blink_type}, room=sid)
-            
-            # Process Morse Logic
-            # Pass the already determined blink_type to avoid re-calculation or errors
-            status, result = communicator.process_blink(blink_info, blink_type)
-            
-            if status == "blink_added":
-                update_ui(sid)
-        
-        # 3. Check for Time-based Decoding (End of letter/word)
-        decode_result = communicator.handle_time_based_decoding()
-        if decode_result["status"] in ["decoded", "space_added"]:
-            print(f"Decoded: {decode_result.get('char', 'SPACE')}")
-            update_ui(sid)
-
-def update_ui(sid):
-    """Helper to emit current state to UI"""
-    socketio.emit('update_ui', {
-        'message': communicator.message_accum,
-        'morse_sequence': communicator.current_morse_sequence,
-        'status': 'Processing',
-        # Optional: Add timing info for UI progress bars
-        'letter_timer': max(0, communicator.LETTER_PAUSE - (time.time() - communicator.last_blink_time)) if communicator.current_morse_sequence else 0,
-        'space_timer': max(0, communicator.SPACE_PAUSE - (time.time() - communicator.last_letter_time)) if communicator.last_letter_time > 0 else 0
-    }, room=sid)
+        for session in session_manager.active_sessions():
+            # Sessions already being serviced are skipped
+            session_manager.submit(session, process_frames)
+
+def process_frames(session):
+    """Processes the latest frame of one session (runs on a pool worker)."""
+    if not detector_settled():
+        # Detector still warming up: discard the frame so processing starts on fresh input
+        session.take_frame()
+        return
+
+    # Only frames not seen before are run through the detector
+    frame, frame_time = session.take_frame()
+    if frame is not None:
+        # The frame buffer is ours until the next take_frame; handlers decode into other buffers
+        process_frame(session, frame, frame_time)
+
+    # 3. Check for Time-based Decoding (End of letter/word)
+    decode_pending(session)
+
+    # 4. One coalesced update with whatever changed during this tick
+    flush_ui(session)
+
+def flush_ui(session):
+    """Emits a 'ui_delta' with the session's UI changes since the last one, if any."""
+    communicator = session.communicator
+    with session.ui.lock:
+        payload = session.ui.build(communicator.message_accum, ui_fields(communicator))
+        if payload:
+            with session.metrics.timer('emit'):
+                socketio.emit('ui_delta', payload, room=session.sid)
 
 if __name__ == '__main__':
     print("Starting Blink Communicator Server...")
@@ -0,0 +1,335 @@
+"""
+Asyncio server mode: the same pages, APIs and Socket.IO events as app.py,
+served by aiohttp with python-socketio's AsyncServer.
+
+Frame ingestion is an async producer: the 'frame'/'frame_bin' handlers only
+stamp the packet and put it on the client's bounded queue. One consumer task
+per client hands the decode and vision work to the session worker pool and
+emits the UI update when it comes back, so the event loop never runs dlib or
+MediaPipe. When a client sends faster than its frames can be processed, the
+oldest queued frames are dropped instead of building up latency.
+
+Usage:
+    pip install aiohttp
+    python async_server.py [--host 0.0.0.0] [--port 5000] [--queue 2]
+"""
+import argparse
+import asyncio
+import os
+import time
+from collections import deque
+from datetime import datetime
+
+import cv2
+import socketio
+from aiohttp import web
+
+import app as server
+from backend_modules.backends import backends
+from backend_modules.frame_codec import decode_data_url, parse_header, FrameDecodeError
+from backend_modules.pipeline import process_frame, decode_pending
+from backend_modules.session_recorder import SessionRecorder
+from backend_modules.ui_channel import ui_fields
+
+# Frames waiting per client; with 2 a frame can be decoded while one is processed
+QUEUE_SIZE = int(os.environ.get('SILENTVOICE_ASYNC_QUEUE', 2))
+DECODE_TICK = server.DECODE_TICK
+
+user_manager = server.user_manager
+session_manager = server.session_manager
+classifier_cache = server.classifier_cache
+
+sio = socketio.AsyncServer(async_mode='aiohttp', cors_allowed_origins='*',
+                           max_http_buffer_size=10 * 1024 * 1024)
+web_app = web.Application()
+sio.attach(web_app)
+
+
+class FrameQueue:
+    """
+    Bounded queue of one client's incoming frames. Putting a frame on a full
+    queue drops the oldest one, so the frame processed next is never older
+    than the last QUEUE_SIZE frames.
+    """
+    def __init__(self, maxlen):
+        self.items = deque(maxlen=maxlen)
+        self.ready = asyncio.Event()
+
+    def __len__(self):
+        return len(self.items)
+
+    def put(self, item):
+        """Returns True if an older frame was dropped to make room."""
+        dropped = len(self.items) == self.items.maxlen
+        self.items.append(item)
+        self.ready.set()
+        return dropped
+
+    def clear(self):
+        self.items.clear()
+
+    async def get(self, timeout):
+        """The oldest queued frame, or None if none arrived within timeout."""
+        if not self.items:
+            self.ready.clear()
+            try:
+                await asyncio.wait_for(self.ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        return self.items.popleft() if self.items else None
+
+
+class Client:
+    """Per-client frame queue and the consumer task draining it."""
+    def __init__(self, session):
+        self.session = session
+        self.queue = FrameQueue(queue_size)
+        self.task = None
+
+
+clients = {}
+queue_size = QUEUE_SIZE
+
+# --- Routes ---
+
+def page(name):
+    async def handler(request):
+        return web.FileResponse(name)
+    return handler
+
+async def list_users_api(request):
+    return web.json_response(user_manager.user_summaries())
+
+async def create_user_api(request):
+    username = request.match_info['username']
+    if user_manager.add_user(username):
+        return web.json_response({"status": "success", "message": f"User '{username}' created."})
+    return web.json_response({"status": "error", "message": "User exists."}, status=409)
+
+async def ready(request):
+    is_ready = server.detector_ready()
+    return web.json_response({'ready': is_ready, 'backends': backends.status()}, status=200 if is_ready else 503)
+
+async def metrics_endpoint(request):
+    for client in list(clients.values()):
+        client.session.metrics.set_gauge('queued_frames', len(client.queue))
+    return web.Response(body=server.metrics_text().encode('utf-8'),
+                        headers={'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'})
+
+web_app.router.add_get('/', page('index.html'))
+web_app.router.add_get('/quick_messages', page('quick_messages.html'))
+web_app.router.add_get('/message.html', page('message.html'))
+web_app.router.add_get('/roomcontrol.html', page('roomcontrol.html'))
+web_app.router.add_get('/devicecontrol.html', page('devicecontrol.html'))
+web_app.router.add_get('/flappy_bird', page('flappy_bird.html'))
+web_app.router.add_get('/users', list_users_api)
+web_app.router.add_get('/create_user/{username}', create_user_api)
+web_app.router.add_get('/ready', ready)
+web_app.router.add_get('/metrics', metrics_endpoint)
+web_app.router.add_static('/static', 'static')
+
+# --- Frame pipeline ---
+
+def process_packet(session, item):
+    """Decodes and processes one queued frame (runs on a pool worker)."""
+    kind, data, arrival, timestamp = item
+    if not server.detector_settled():
+        # Detector still warming up: discard the frame so processing starts on fresh input
+        session.drop_frame()
+        return
+    session.metrics.observe('queue_wait', time.time() - arrival)
+    try:
+        with session.metrics.timer('decode'):
+            if kind == 'bin':
+                accepted = session.decode_packet(data, timestamp)
+            else:
+                frame = decode_data_url(data)
+                if frame is not None and session.recorder:
+                    session.recorder.write_frame(frame)
+                accepted = frame is not None and session.set_frame(frame)
+    except (FrameDecodeError, ValueError, cv2.error) as e:
+        # Malformed packet or data URL (bad base64 raises binascii.Error, a ValueError)
+        print(f"[{session.sid}] Dropped frame: {e}")
+        session.drop_frame()
+        return
+    if accepted:
+        frame, frame_time = session.take_frame()
+        process_frame(session, frame, frame_time)
+
+def process_tick(session, item):
+    """One consumer step on a pool worker: the frame (if any), then pending letters/spaces."""
+    if item is not None:
+        process_packet(session, item)
+    decode_pending(session)
+
+async def consume_frames(client):
+    """Consumer task of one client: processes queued frames in order, one at a time."""
+    session = client.session
+    loop = asyncio.get_running_loop()
+    while session.processing_active and not session.closed:
+        item = await client.queue.get(DECODE_TICK)
+        future = session_manager.run(session, lambda s: process_tick(s, item))
+        if future is None:
+            break
+        try:
+            await asyncio.wrap_future(future, loop=loop)
+        except Exception as e:
+            print(f"Session {session.sid} processing error: {e}")
+        await flush_ui(session)
+
+async def flush_ui(session):
+    """Emits a 'ui_delta' with the session's UI changes since the last one, if any."""
+    communicator = session.communicator
+    with session.ui.lock:
+        payload = session.ui.build(communicator.message_accum, ui_fields(communicator))
+    if payload:
+        with session.metrics.timer('emit'):
+            await sio.emit('ui_delta', payload, to=session.sid)
+
+def enqueue(sid, item):
+    client = clients.get(sid)
+    if client is None or not client.session.processing_active:
+        return
+    if client.queue.put(item):
+        client.session.drop_frame()
+
+# --- Socket Events ---
+
+@sio.event
+async def connect(sid, environ):
+    print(f'Client connected: {sid}')
+    clients[sid] = Client(session_manager.get_or_create(sid))
+
+@sio.event
+async def disconnect(sid, *args):
+    print(f'Client disconnected: {sid}')
+    client = clients.pop(sid, None)
+    if client:
+        client.queue.clear()
+        if client.task:
+            client.task.cancel()
+        server.save_user_learning(client.session)
+    session_manager.remove(sid)
+
+@sio.on('select_user')
+async def handle_select_user(sid, data):
+    username = data.get('username')
+    user_info = user_manager.get_user(username)
+
+    if not user_info:
+        return {'status': 'error', 'message': 'User not found'}
+
+    session = session_manager.get_or_create(sid)
+    server.save_user_learning(session)
+    communicator = session.communicator
+    communicator.current_user = username
+
+    user_manager.touch_user(username)
+
+    # Model loading reads from disk; keep it off the event loop
+    loaded = await asyncio.get_running_loop().run_in_executor(
+        None, communicator.load_user_profile, user_info, classifier_cache)
+    if loaded:
+        return {'status': 'success', 'message': f"User {username} loaded"}
+    return {'status': 'success', 'message': f"User {username} selected (Not trained)"}
+
+@sio.on('set_mode')
+async def set_mode(sid, data):
+    mode = data.get('mode')
+    print(f"Mode switched to: {mode}")
+    if mode == 'idle':
+        session = session_manager.get_or_create(sid)
+        session.communicator.reset_state()
+        await flush_ui(session)
+
+@sio.on('ui_resync')
+async def handle_ui_resync(sid):
+    session = session_manager.get(sid)
+    if session:
+        session.ui.resync()
+        await flush_ui(session)
+
+@sio.on('start_stream')
+async def start_stream(sid):
+    client = clients.get(sid)
+    if client is None:
+        return
+    session = client.session
+    if not session.processing_active:
+        session.communicator.blink_detector.reset()
+        if server.RECORD_DIR and session.recorder is None:
+            name = f"{session.communicator.current_user or 'session'}_{datetime.now():%Y%m%d_%H%M%S}_{sid}.svrec"
+            session.recorder = SessionRecorder(os.path.join(server.RECORD_DIR, name))
+        session.processing_active = True
+        if client.task is None or client.task.done():
+            client.task = asyncio.create_task(consume_frames(client))
+        print(f"Processing started for SID: {sid}")
+        await sio.emit('stream_started', {'message': 'Backend processing started'}, to=sid)
+
+@sio.on('stop_stream')
+async def stop_stream(sid):
+    session = session_manager.get(sid)
+    if session:
+        session.processing_active = False
+        client = clients.get(sid)
+        if client:
+            client.queue.clear()
+        print(f"Processing stopped for SID: {sid} frames: {session.get_frame_stats()}")
+        session.stop_recording()
+        server.save_user_learning(session)
+    await sio.emit('stream_stopped', {'message': 'Backend processing stopped'}, to=sid)
+
+@sio.on('send_quick_message')
+async def handle_quick_message(sid, data):
+    msg = data.get('message')
+    print(f"Quick Message: {msg}")
+    await sio.emit('status', {'message': f"Sent: {msg}"}, to=sid)
+
+@sio.on('room_command')
+async def handle_room_command(sid, data):
+    communicator = session_manager.get_or_create(sid).communicator
+    result = communicator.send_room_control(data.get('device'), data.get('action'))
+    await sio.emit('status', {'message': result['message']}, to=sid)
+
+@sio.on('get_stats')
+async def handle_get_stats(sid):
+    session = session_manager.get(sid)
+    return session.get_frame_stats() if session else {}
+
+@sio.on('frame')
+async def handle_frame(sid, data):
+    """Legacy transport: base64 JPEG data URL, decoded on the worker."""
+    if isinstance(data, dict) and 'image' in data:
+        enqueue(sid, ('url', data['image'], time.time(), None))
+
+@sio.on('frame_bin')
+async def handle_frame_bin(sid, packet):
+    """Binary transport: only the header is read here, the payload is decoded on the worker."""
+    client = clients.get(sid)
+    if client is None:
+        return
+    session = client.session
+    try:
+        header = parse_header(packet)
+    except FrameDecodeError as e:
+        print(f"[{sid}] Dropped frame: {e}")
+        session.drop_frame()
+        return
+    # Capture times are mapped on arrival, before any queueing delay
+    enqueue(sid, ('bin', packet, time.time(), session.to_server_time(header['timestamp'])))
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the SilentVoice server on asyncio (aiohttp).")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--queue', type=int, default=QUEUE_SIZE, help="Frames queued per client before the oldest is dropped")
+    args = parser.parse_args()
+
+    global queue_size
+    queue_size = max(1, args.queue)
+    print(f"Starting Blink Communicator Server (asyncio, {session_manager.max_workers} workers, queue {queue_size})...")
+    server.warm_up_backends()
+    web.run_app(web_app, host=args.host, port=args.port)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+import importlib
+import sys
+import threading
+import time
+
+PENDING = 'pending'
+LOADING = 'loading'
+READY = 'ready'
+FAILED = 'failed'
+
+class Backend:
+    def __init__(self, name, loader, depends=()):
+        self.name = name
+        self.loader = loader
+        self.depends = tuple(depends)
+        self.state = PENDING
+        self.value = None
+        self.error = None
+        self.seconds = None
+        self.modules_loaded = 0
+        self.lock = threading.Lock()
+
+class BackendRegistry:
+    """
+    Heavy libraries and models (dlib, the shape predictor, MediaPipe, ...)
+    registered by name and loaded on first use or by a background warm-up
+    thread, so the web server can start serving before they are ready.
+    """
+    def __init__(self):
+        self.backends = {}
+        self.warmup_thread = None
+        self.warmup_lock = threading.Lock()
+
+    def register(self, name, loader, depends=()):
+        if name not in self.backends:
+            self.backends[name] = Backend(name, loader, depends)
+
+    def register_module(self, name, module_name=None):
+        self.register(name, lambda: importlib.import_module(module_name or name))
+
+    def get(self, name, block=True):
+        """
+        Returns the loaded backend, loading it in this thread if nobody has yet.
+        With block=False, returns None instead of waiting for a load already
+        running in another thread. Raises RuntimeError if loading failed.
+        """
+        backend = self.backends[name]
+        if backend.state == READY:
+            return backend.value
+        if not backend.lock.acquire(blocking=block):
+            return None
+        try:
+            if backend.state == PENDING:
+                self._load(backend)
+        finally:
+            backend.lock.release()
+        if backend.state == FAILED:
+            raise RuntimeError(f"Backend '{name}' failed to load: {backend.error}")
+        return backend.value
+
+    def _load(self, backend):
+        try:
+            for dep in backend.depends:
+                self.get(dep)
+        except RuntimeError as e:
+            backend.error = str(e)
+            backend.state = FAILED
+            return
+        backend.state = LOADING
+        modules_before = len(sys.modules)
+        start = time.perf_counter()
+        try:
+            backend.value = backend.loader()
+            backend.state = READY
+        except Exception as e:
+            backend.error = str(e)
+            backend.state = FAILED
+            print(f"Backend '{backend.name}' failed to load: {e}")
+        backend.seconds = time.perf_counter() - start
+        backend.modules_loaded = len(sys.modules) - modules_before
+
+    def is_ready(self, *names):
+        return all(self.backends[n].state == READY for n in names)
+
+    def has_failed(self, *names):
+        """True if any of the backends failed to load (or a dependency did)."""
+        return any(self.backends[n].state == FAILED for n in names)
+
+    def is_settled(self, *names):
+        """True once each backend has either loaded or failed (nothing left to wait for)."""
+        return all(self.backends[n].state in (READY, FAILED) for n in names)
+
+    def warm_up(self, names=None, exclude=()):
+        """
+        Loads the given backends (default: all but exclude) one after another
+        in a background thread. Only the first call starts the thread; later
+        calls return it, so every entry point of the server can call this.
+        """
+        with self.warmup_lock:
+            if self.warmup_thread is None:
+                names = [n for n in (names or self.backends) if n not in exclude]
+                self.warmup_thread = self._start_warm_up(names)
+            return self.warmup_thread
+
+    def _start_warm_up(self, names):
+        def run():
+            for name in names:
+                try:
+                    self.get(name)
+                except RuntimeError:
+                    pass
+            print(self.format_report())
+
+        thread = threading.Thread(target=run, name='backend-warmup', daemon=True)
+        thread.start()
+        return thread
+
+    def status(self):
+        return {
+            name: {
+                'state': b.state,
+                'seconds': round(b.seconds, 3) if b.seconds is not None else None,
+                'modules_loaded': b.modules_loaded,
+                'error': b.error
+            } for name, b in self.backends.items()
+        }
+
+    def format_report(self):
+        """Import/initialisation time per backend, slowest first."""
+        lines = ["Backend load times:"]
+        loaded = [b for b in self.backends.values() if b.seconds is not None]
+        for b in sorted(loaded, key=lambda b: b.seconds, reverse=True):
+            lines.append(f"  {b.name:<16} {b.seconds:7.3f}s  {b.modules_loaded:5d} modules  {b.state}")
+        for b in self.backends.values():
+            if b.seconds is None:
+                lines.append(f"  {b.name:<16} {'-':>7}   {'':5}          {b.state}")
+        return '\n'.join(lines)
+
+# Process-wide registry; modules register the backends they need at import time
+backends = BackendRegistry()
@@ -1,26 +1,104 @@
 import cv2
 import numpy as np
-import dlib
-import mediapipe as mp
-from scipy.spatial import distance
 from collections import deque
 import time
 import os
 
+from .backends import backends
+from .metrics import NULL_METRICS
+from .enhancement import LowLightEnhancer
+from .face_backends import DEFAULT_FACE_BACKENDS, FaceBackendSelector
+from .ear_kernel import DLIB_EYE_INDICES, MEDIAPIPE_EYE_INDICES, dlib_eye_points, mediapipe_eye_points, mean_ear
+
+PREDICTOR_PATH = "shape_predictor_68_face_landmarks.dat"
+
+def _download_shape_predictor():
+    import urllib.request
+    import bz2
+    url = "http://dlib.net/files/shape_predictor_68_face_landmarks.dat.bz2"
+    try:
+        urllib.request.urlretrieve(url, f"{PREDICTOR_PATH}.bz2")
+        with bz2.BZ2File(f"{PREDICTOR_PATH}.bz2", 'rb') as f_in:
+            with open(PREDICTOR_PATH, 'wb') as f_out:
+                f_out.write(f_in.read())
+        os.remove(f"{PREDICTOR_PATH}.bz2")
+        print("Shape predictor model downloaded successfully!")
+    except Exception as e:
+        print(f"Failed to download shape predictor: {e}. Please ensure internet connection or provide the file manually.")
+        raise
+
+def _load_shape_predictor():
+    dlib = backends.get('dlib')
+    if not os.path.exists(PREDICTOR_PATH):
+        print("Downloading dlib shape predictor model...")
+        _download_shape_predictor()
+    return dlib.shape_predictor(PREDICTOR_PATH)
+
+# dlib and MediaPipe are imported on first use, or ahead of time by the
+# server's warm-up thread. The shape predictor is large and read-only once
+# loaded, so every detector instance (one per client session) shares a
+# single copy. The HOG face detector keeps scratch state while scanning and
+# stays per-instance.
+backends.register_module('dlib')
+backends.register('shape_predictor', _load_shape_predictor, depends=('dlib',))
+backends.register_module('mediapipe')
+
+# Backends the primary (dlib) detection path needs before it can run
+DETECTOR_BACKENDS = ('dlib', 'shape_predictor')
+# Everything face detection may load, including the MediaPipe fallback
+VISION_BACKENDS = DETECTOR_BACKENDS + ('mediapipe',)
+
 class BlinkDetector:
-    def __init__(self):
-        self.detector = dlib.get_frontal_face_detector()
-        predictor_path = "shape_predictor_68_face_landmarks.dat"
-        if not os.path.exists(predictor_path):
-            print("Downloading dlib shape predictor model...")
-            self._download_shape_predictor()
-        self.predictor = dlib.shape_predictor(predictor_path)
-
-        self.mp_face_mesh = mp.solutions.face_mesh
-        self.LEFT_EYE_POINTS = list(range(36, 42))
-        self.RIGHT_EYE_POINTS = list(range(42, 48))
-        self.LEFT_EYE_EAR_INDICES = [33, 160, 158, 133, 153, 144]
-        self.RIGHT_EYE_EAR_INDICES = [362, 385, 387, 263, 373, 380]
+    # Re-detect policies for the dlib face tracker
+    REDETECT_ALWAYS = 'always'          # full-frame detection every frame (no tracking)
+    REDETECT_INTERVAL = 'interval'      # every N frames, track in between
+    REDETECT_CONFIDENCE = 'confidence'  # only when tracking confidence drops
+    REDETECT_HYBRID = 'hybrid'          # whichever comes first
+    REDETECT_POLICIES = (REDETECT_ALWAYS, REDETECT_INTERVAL, REDETECT_CONFIDENCE, REDETECT_HYBRID)
+    # detection_scale value that picks the scale from recent face sizes
+    SCALE_AUTO = 'auto'
+
+    def __init__(self, redetect_policy='hybrid', redetect_interval=10, min_track_confidence=7.0, roi_padding=0.5,
+                 landmark_padding=0.25, detection_scale='auto', target_face_size=120, min_detection_scale=0.25,
+                 face_backends=DEFAULT_FACE_BACKENDS):
+        # Loaded on first use (see _ensure_dlib / _get_face_mesh)
+        self.dlib = None
+        self.detector = None
+        self.predictor = None
+
+        # Face tracking between full-frame HOG detections
+        self.redetect_policy = self.parse_redetect_policy(redetect_policy)
+        self.redetect_interval = redetect_interval
+        self.min_track_confidence = min_track_confidence  # correlation tracker PSR
+        self.roi_padding = roi_padding  # fraction of the face box added on each side
+        self.face_tracker = None
+        self.last_face_rect = None
+        self.frames_since_detection = 0
+        self.track_confidence = 0.0
+        self.detections_performed = 0
+        self.roi_detections = 0
+        self.detections_skipped = 0
+
+        # HOG detection runs on a downscaled copy of the frame; landmarks use full resolution.
+        # In 'auto' mode the scale brings the recent face width down to target_face_size
+        # pixels (dlib's HOG window is 80x80, so faces much smaller than that are missed).
+        self.detection_scale = self.parse_detection_scale(detection_scale)
+        self.target_face_size = target_face_size
+        self.min_detection_scale = min_detection_scale
+        self.face_widths = deque(maxlen=10)
+        self.last_detection_scale = 1.0
+
+        self.mp_face_mesh = None
+        # Long-lived FaceMesh graph in video mode, created on first use
+        self.face_mesh = None
+        # Left then right eye landmark indices, in EAR point order
+        self.DLIB_EYE_INDICES = DLIB_EYE_INDICES
+        self.MEDIAPIPE_EYE_INDICES = MEDIAPIPE_EYE_INDICES
+        # (12, 2) eye landmarks of the last frame with a face, in pixels
+        self.last_eye_points = None
+        # Face/landmark backends in preference order, with sticky fallback and no-face backoff
+        self.face_backend_names = tuple(face_backends)
+        self.backend_selector = FaceBackendSelector(self, self.face_backend_names)
         
         self.base_ear_thresh = 0.21
         self.current_ear_thresh = self.base_ear_thresh
@@ -29,68 +107,88 @@ class BlinkDetector:
         self.counter = 0
         self.blink_detected = False
         self.blink_start_time = 0
-        self.brightness_history = deque(maxlen=10)
+        self.last_frame_time = float('-inf')
+        # Low-light enhancement; only the face crop given to the shape predictor gets CLAHE
+        self.enhancer = LowLightEnhancer()
+        self.landmark_padding = landmark_padding  # context kept around the face box for the predictor
         self.use_enhancement = False
+        # Stage timings; sessions replace this with their own registry
+        self.metrics = NULL_METRICS
 
-    def _download_shape_predictor(self):
-        import urllib.request
-        import bz2
-        url = "http://dlib.net/files/shape_predictor_68_face_landmarks.dat.bz2"
-        try:
-            urllib.request.urlretrieve(url, "shape_predictor_68_face_landmarks.dat.bz2")
-            with bz2.BZ2File("shape_predictor_68_face_landmarks.dat.bz2", 'rb') as f_in:
-                with open("shape_predictor_68_face_landmarks.dat", 'wb') as f_out:
-                    f_out.write(f_in.read())
-            os.remove("shape_predictor_68_face_landmarks.dat.bz2")
-            print("Shape predictor model downloaded successfully!")
-        except Exception as e:
-            print(f"Failed to download shape predictor: {e}. Please ensure internet connection or provide the file manually.")
-            raise
+    def _ensure_dlib(self):
+        if self.detector is None:
+            self.dlib = backends.get('dlib')
+            self.predictor = backends.get('shape_predictor')
+            self.detector = self.dlib.get_frontal_face_detector()
+
+    def _get_face_mesh(self):
+        if self.face_mesh is None:
+            if self.mp_face_mesh is None:
+                # Don't stall a frame while the warm-up thread is still importing MediaPipe
+                mp = backends.get('mediapipe', block=False)
+                if mp is None:
+                    return None
+                self.mp_face_mesh = mp.solutions.face_mesh
+            # static_image_mode=False keeps MediaPipe tracking landmarks between
+            # frames instead of running a cold detection on every call
+            self.face_mesh = self.mp_face_mesh.FaceMesh(
+                static_image_mode=False,
+                max_num_faces=1,
+                min_detection_confidence=0.3,
+                min_tracking_confidence=0.3)
+        return self.face_mesh
+
+    def reset_tracking(self):
+        """Drops dlib and MediaPipe tracking state so the next frame runs a fresh detection."""
+        self.face_tracker = None
+        self.last_face_rect = None
+        self.frames_since_detection = 0
+        self.track_confidence = 0.0
+        self.face_widths.clear()
+        if self.face_mesh is not None:
+            self.face_mesh.reset()
+
+    def get_tracking_stats(self):
+        return {
+            'policy': self.redetect_policy,
+            'detections_performed': self.detections_performed,
+            'roi_detections': self.roi_detections,
+            'detections_skipped': self.detections_skipped,
+            'track_confidence': self.track_confidence,
+            'detection_scale': self.last_detection_scale
+        }
+
+    def get_backend_stats(self):
+        return self.backend_selector.get_stats()
+
+    def reset(self):
+        """Resets tracking and the blink state machine (e.g. when the stream restarts)."""
+        self.reset_tracking()
+        self.backend_selector.reset()
+        self.ear_history.clear()
+        self.enhancer.reset()
+        self.use_enhancement = False
+        self.current_ear_thresh = self.base_ear_thresh
+        self.counter = 0
+        self.blink_detected = False
+        self.blink_start_time = 0
+        self.last_frame_time = float('-inf')
+
+    def close(self):
+        """Releases the MediaPipe graph. The detector can still be used afterwards."""
+        if self.face_mesh is not None:
+            self.face_mesh.close()
+            self.face_mesh = None
+
+    def measure_brightness(self, frame):
+        """Updates the low-light level from this frame; called once per frame."""
+        self.enhancer.measure(frame)
+        self.use_enhancement = self.enhancer.active
 
     def enhance_frame(self, frame):
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        brightness = np.mean(gray)
-        self.brightness_history.append(brightness)
-        avg_brightness = np.mean(self.brightness_history)
-        self.use_enhancement = avg_brightness < 80
-        if self.use_enhancement:
-            clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8,8))
-            lab = cv2.cvtColor(frame, cv2.COLOR_BGR2LAB)
-            lab[:,:,0] = clahe.apply(lab[:,:,0])
-            enhanced = cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
-            if avg_brightness < 50:
-                enhanced = cv2.convertScaleAbs(enhanced, alpha=1.3, beta=25)
-            return enhanced
-        return frame
-
-    def eye_aspect_ratio_dlib(self, eye_landmarks):
-        try:
-            A = distance.euclidean(eye_landmarks[1], eye_landmarks[5])
-            B = distance.euclidean(eye_landmarks[2], eye_landmarks[4])
-            C = distance.euclidean(eye_landmarks[0], eye_landmarks[3])
-            if C == 0: return 0
-            return (A + B) / (2.0 * C)
-        except IndexError:
-            return 0
-
-    def eye_aspect_ratio_mediapipe(self, eye_landmarks):
-        try:
-            A = distance.euclidean(eye_landmarks[1], eye_landmarks[5])
-            B = distance.euclidean(eye_landmarks[2], eye_landmarks[4])
-            C = distance.euclidean(eye_landmarks[0], eye_landmarks[3])
-            if C == 0: return 0
-            return (A + B) / (2.0 * C)
-        except IndexError:
-            return 0
-
-    def get_eye_landmarks_mediapipe(self, landmarks, eye_indices, image_width, image_height):
-        eye_points = []
-        for idx in eye_indices:
-            landmark = landmarks.landmark[idx]
-            x = int(landmark.x * image_width)
-            y = int(landmark.y * image_height)
-            eye_points.append([x, y])
-        return np.array(eye_points)
+        """Measures brightness and enhances the whole frame (BGR or grayscale)."""
+        self.measure_brightness(frame)
+        return self.enhancer.enhance_full(frame)
 
     def adapt_threshold(self, current_ear):
         if current_ear is not None:
@@ -102,19 +200,153 @@ class BlinkDetector:
                 adaptive_thresh = max(0.15, min(0.25, mean_ear - 2*std_ear))
                 self.current_ear_thresh = 0.7 * self.current_ear_thresh + 0.3 * adaptive_thresh
 
+    def _needs_full_detection(self):
+        if self.face_tracker is None or self.redetect_policy == self.REDETECT_ALWAYS:
+            return True
+        if self.redetect_policy in (self.REDETECT_INTERVAL, self.REDETECT_HYBRID):
+            return self.frames_since_detection >= self.redetect_interval
+        return False
+
+    @classmethod
+    def parse_redetect_policy(cls, value):
+        """One of REDETECT_POLICIES; checked here so a typo doesn't quietly act like 'confidence'."""
+        if value not in cls.REDETECT_POLICIES:
+            raise ValueError(f"redetect_policy must be one of {', '.join(cls.REDETECT_POLICIES)}, got {value!r}")
+        return value
+
+    @classmethod
+    def parse_detection_scale(cls, value):
+        """'auto' or a factor in (0, 1]; checked here so a bad setting fails at startup, not per frame."""
+        if value == cls.SCALE_AUTO:
+            return value
+        try:
+            scale = float(value)
+        except (TypeError, ValueError):
+            scale = None
+        if scale is None or not 0 < scale <= 1:
+            raise ValueError(f"detection_scale must be '{cls.SCALE_AUTO}' or a number in (0, 1], got {value!r}")
+        return scale
+
+    def current_detection_scale(self):
+        """Scale of the image the HOG detector scans: fixed, or from recent face widths in 'auto' mode."""
+        if self.detection_scale != self.SCALE_AUTO:
+            return self.detection_scale
+        if not self.face_widths:
+            return 1.0
+        scale = self.target_face_size / float(np.median(self.face_widths))
+        return min(1.0, max(self.min_detection_scale, scale))
+
+    def _run_detector(self, image):
+        """HOG face detection on a downscaled copy of image; boxes come back in image coordinates."""
+        scale = self.current_detection_scale()
+        self.last_detection_scale = scale
+        if scale >= 1.0:
+            return list(self.detector(image))
+        small = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        sx = image.shape[1] / small.shape[1]
+        sy = image.shape[0] / small.shape[0]
+        return [self.dlib.rectangle(int(f.left() * sx), int(f.top() * sy), int(f.right() * sx), int(f.bottom() * sy))
+                for f in self.detector(small)]
+
+    def _start_track(self, gray, face):
+        self.face_tracker = self.dlib.correlation_tracker()
+        self.face_tracker.start_track(gray, face)
+        self.last_face_rect = face
+        self.frames_since_detection = 0
+        self.track_confidence = float('inf')
+
+    def _detect_in_roi(self, gray):
+        """Runs the HOG detector on a padded crop around the last face box only."""
+        rect = self.last_face_rect
+        pad_x = int(rect.width() * self.roi_padding)
+        pad_y = int(rect.height() * self.roi_padding)
+        x0 = max(0, rect.left() - pad_x)
+        y0 = max(0, rect.top() - pad_y)
+        x1 = min(gray.shape[1], rect.right() + pad_x)
+        y1 = min(gray.shape[0], rect.bottom() + pad_y)
+        if x1 <= x0 or y1 <= y0:
+            return None
+        faces = self._run_detector(np.ascontiguousarray(gray[y0:y1, x0:x1]))
+        if len(faces) == 0:
+            return None
+        f = faces[0]
+        return self.dlib.rectangle(f.left() + x0, f.top() + y0, f.right() + x0, f.bottom() + y0)
+
+    def locate_face(self, gray):
+        """
+        Returns the face rectangle for this frame, running the full-frame
+        detector only when the re-detect policy asks for it.
+        """
+        if not self._needs_full_detection():
+            self.track_confidence = self.face_tracker.update(gray)
+            if self.redetect_policy == self.REDETECT_INTERVAL or self.track_confidence >= self.min_track_confidence:
+                pos = self.face_tracker.get_position()
+                self.last_face_rect = self.dlib.rectangle(int(pos.left()), int(pos.top()), int(pos.right()), int(pos.bottom()))
+                self.frames_since_detection += 1
+                self.detections_skipped += 1
+                self.face_widths.append(self.last_face_rect.width())
+                return self.last_face_rect
+
+            # Tracking confidence dropped: look near the last position before scanning everything
+            face = self._detect_in_roi(gray)
+            if face is not None:
+                self.roi_detections += 1
+                self.face_widths.append(face.width())
+                self._start_track(gray, face)
+                return face
+
+        self.detections_performed += 1
+        faces = self._run_detector(gray)
+        if len(faces) == 0:
+            self.face_tracker = None
+            self.last_face_rect = None
+            # The face may have moved away and shrunk below the HOG window: scan at full size next
+            self.face_widths.clear()
+            return None
+        face = faces[0]
+        self.face_widths.append(face.width())
+        if self.redetect_policy != self.REDETECT_ALWAYS:
+            self._start_track(gray, face)
+        return face
+
+    def _landmark_input(self, gray, face):
+        """
+        Image and face box for the shape predictor. In low light only a padded
+        crop around the face is enhanced; returns (image, rect, (x0, y0)).
+        """
+        if not self.enhancer.active:
+            return gray, face, (0, 0)
+        pad_x = int(face.width() * self.landmark_padding)
+        pad_y = int(face.height() * self.landmark_padding)
+        x0 = max(0, face.left() - pad_x)
+        y0 = max(0, face.top() - pad_y)
+        x1 = min(gray.shape[1], face.right() + pad_x)
+        y1 = min(gray.shape[0], face.bottom() + pad_y)
+        if x1 <= x0 or y1 <= y0:
+            return gray, face, (0, 0)
+        roi = self.enhancer.enhance_roi(gray[y0:y1, x0:x1])
+        rect = self.dlib.rectangle(face.left() - x0, face.top() - y0, face.right() - x0, face.bottom() - y0)
+        return roi, rect, (x0, y0)
+
     def detect_blink_dlib(self, frame):
         try:
-            enhanced_frame = self.enhance_frame(frame)
-            gray = cv2.cvtColor(enhanced_frame, cv2.COLOR_BGR2GRAY)
-            faces = self.detector(gray)
-            if len(faces) > 0:
-                face = faces[0]
-                landmarks = self.predictor(gray, face)
-                left_eye = np.array([(landmarks.part(i).x, landmarks.part(i).y) for i in self.LEFT_EYE_POINTS])
-                right_eye = np.array([(landmarks.part(i).x, landmarks.part(i).y) for i in self.RIGHT_EYE_POINTS])
-                left_ear = self.eye_aspect_ratio_dlib(left_eye)
-                right_ear = self.eye_aspect_ratio_dlib(right_eye)
-                ear = (left_ear + right_ear) / 2.0
+            self._ensure_dlib()
+            with self.metrics.timer('enhance'):
+                # Frames are BGR, or single-channel when the client sends raw grayscale
+                gray = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+                search_gray = self.enhancer.detection_gray(gray)
+            with self.metrics.timer('face_detect'):
+                face = self.locate_face(search_gray)
+            if face is not None:
+                with self.metrics.timer('enhance_roi'):
+                    image, rect, (x0, y0) = self._landmark_input(gray, face)
+                with self.metrics.timer('shape_predictor'):
+                    landmarks = self.predictor(image, rect)
+                    points = dlib_eye_points(landmarks, self.DLIB_EYE_INDICES)
+                    if x0 or y0:
+                        points += (x0, y0)
+                    self.last_eye_points = points
+                    ear = float(mean_ear(points))
                 return ear, True
             return None, False
         except Exception:
@@ -122,38 +354,50 @@ class BlinkDetector:
 
     def detect_blink_mediapipe(self, frame):
         try:
-            with self.mp_face_mesh.FaceMesh(
-                max_num_faces=1,
-                min_detection_confidence=0.3,
-                min_tracking_confidence=0.3) as face_mesh:
-
-                enhanced_frame = self.enhance_frame(frame)
-                rgb_frame = cv2.cvtColor(enhanced_frame, cv2.COLOR_BGR2RGB)
-                rgb_frame.flags.writeable = False
-                results = face_mesh.process(rgb_frame)
-                rgb_frame.flags.writeable = True
-
-                if results.multi_face_landmarks:
-                    for face_landmarks in results.multi_face_landmarks:
-                        h, w = enhanced_frame.shape[:2]
-                        left_eye = self.get_eye_landmarks_mediapipe(face_landmarks, self.LEFT_EYE_EAR_INDICES, w, h)
-                        right_eye = self.get_eye_landmarks_mediapipe(face_landmarks, self.RIGHT_EYE_EAR_INDICES, w, h)
-                        left_ear = self.eye_aspect_ratio_mediapipe(left_eye)
-                        right_ear = self.eye_aspect_ratio_mediapipe(right_eye)
-                        ear = (left_ear + right_ear) / 2.0
-                        return ear, True
+            face_mesh = self._get_face_mesh()
+            if face_mesh is None:
+                return None, False
+
+            enhanced_frame = self.enhancer.enhance_full(frame)
+            rgb_frame = cv2.cvtColor(enhanced_frame, cv2.COLOR_GRAY2RGB if enhanced_frame.ndim == 2 else cv2.COLOR_BGR2RGB)
+            rgb_frame.flags.writeable = False
+            results = face_mesh.process(rgb_frame)
+            rgb_frame.flags.writeable = True
+
+            if results.multi_face_landmarks:
+                for face_landmarks in results.multi_face_landmarks:
+                    h, w = enhanced_frame.shape[:2]
+                    self.last_eye_points = mediapipe_eye_points(face_landmarks, w, h, self.MEDIAPIPE_EYE_INDICES)
+                    ear = float(mean_ear(self.last_eye_points))
+                    return ear, True
             return None, False
         except Exception:
             return None, False
 
-    def detect_blink(self, frame):
+    def detect_blink(self, frame, timestamp=None):
+        """
+        Runs one frame through the blink state machine.
+
+        Args:
+            frame: BGR or grayscale image.
+            timestamp (float, optional): Capture time of the frame in seconds.
+                Defaults to the current wall clock. Passing the capture time
+                keeps blink durations exact when processing lags behind, and
+                makes replays deterministic.
+        """
+        now = time.time() if timestamp is None else timestamp
+        if timestamp is not None:
+            # A frame that is not newer than the last one would distort durations
+            if timestamp <= self.last_frame_time:
+                return None, None
+            self.last_frame_time = timestamp
+
         blink_info = None
         current_ear = None
-        ear, dlib_success = self.detect_blink_dlib(frame)
-        if not dlib_success:
-            ear, mp_success = self.detect_blink_mediapipe(frame)
-            if not mp_success:
-                return None, None
+        self.measure_brightness(frame)
+        ear = self.backend_selector.detect(frame)
+        if ear is None:
+            return None, None
         
         current_ear = ear
         self.adapt_threshold(current_ear)
@@ -161,19 +405,66 @@ class BlinkDetector:
         if ear is not None and ear < self.current_ear_thresh:
             self.counter += 1
             if not self.blink_detected:
-                self.blink_start_time = time.time()
+                self.blink_start_time = now
                 self.blink_detected = True
         else:
             if self.counter >= self.EYE_AR_CONSEC_FRAMES and self.blink_detected:
-                blink_duration = time.time() - self.blink_start_time
+                blink_duration = now - self.blink_start_time
                 if 0.05 < blink_duration < 3.0: 
                     blink_info = {
                         'duration': blink_duration,
                         'intensity': max(0.01, self.current_ear_thresh - min(ear if ear else 0, self.current_ear_thresh)),
-                        'timestamp': time.time(),
+                        'timestamp': now,
                         'min_ear': ear if ear else 0,
                         'enhanced': self.use_enhancement
                     }
             self.counter = 0
             self.blink_detected = False
-        return blink_info, current_ear
\ No newline at end of file
+        return blink_info, current_ear
+
+    def process_video(self, path, start_frame=0, end_frame=None, fps=None, workers=1):
+        """
+        Streams a video file through the detector, yielding one record per frame:
+        {'frame': index, 'time': seconds, 'ear': EAR or None, 'blink': blink_info or None}.
+        Timing comes from the frame index and the file's frame rate, so results
+        do not depend on how fast frames are processed.
+
+        With workers > 1 the file is split into overlapping chunks processed
+        by a process pool (see video_processing.process_video_parallel); this
+        detector's own state is not used in that case.
+        """
+        if workers > 1:
+            from .video_processing import process_video_parallel
+            options = {
+                'redetect_policy': self.redetect_policy,
+                'redetect_interval': self.redetect_interval,
+                'min_track_confidence': self.min_track_confidence,
+                'roi_padding': self.roi_padding,
+                'landmark_padding': self.landmark_padding,
+                'detection_scale': self.detection_scale,
+                'target_face_size': self.target_face_size,
+                'min_detection_scale': self.min_detection_scale,
+                'face_backends': self.face_backend_names,
+            }
+            yield from process_video_parallel(path, workers=workers, start_frame=start_frame, end_frame=end_frame,
+                                              fps=fps, detector_options=options)
+            return
+
+        cap = cv2.VideoCapture(path)
+        if not cap.isOpened():
+            raise IOError(f"Could not open video: {path}")
+        try:
+            fps = fps or cap.get(cv2.CAP_PROP_FPS) or 30.0
+            if start_frame:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+            index = start_frame
+            while end_frame is None or index < end_frame:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                timestamp = index / fps
+                blink_info, ear = self.detect_blink(frame, timestamp)
+                yield {'frame': index, 'time': timestamp, 'ear': ear, 'blink': blink_info}
+                index += 1
+        finally:
+            cap.release()
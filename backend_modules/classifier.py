@@ -4,29 +4,62 @@ import warnings
 import logging
 import pickle
 
-# --- Suppress TensorFlow and related logs for a cleaner console ---
-os.environ['TF_ENABLE_ONEDNN_OPTS'] = '0'
-os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
-warnings.filterwarnings('ignore', category=UserWarning)
-warnings.filterwarnings('ignore', category=FutureWarning)
-warnings.filterwarnings('ignore', category=DeprecationWarning)
-warnings.filterwarnings('ignore', category=Warning)
+from .mlp_engine import NumpyMLP, WEIGHTS_SUFFIX
+from .model_artifact import MODEL_SUFFIX, read_model_artifact
+from .backends import backends
 
-import tensorflow as tf
-tf.get_logger().setLevel('ERROR')
-logging.getLogger('tensorflow').setLevel(logging.ERROR)
-logging.getLogger('absl').setLevel(logging.ERROR)
+# scikit-learn is only needed to unpickle the user's StandardScaler; warm it up off the request path
+backends.register_module('sklearn', 'sklearn.preprocessing')
 
-from tf_keras.models import load_model
+def load_keras_model(model_file):
+    """
+    Imports TensorFlow on demand and loads a Keras model. The server only
+    needs this once per user, to export weights for the NumPy engine.
+    """
+    # --- Suppress TensorFlow and related logs for a cleaner console ---
+    os.environ['TF_ENABLE_ONEDNN_OPTS'] = '0'
+    os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
+    warnings.filterwarnings('ignore', category=UserWarning)
+    warnings.filterwarnings('ignore', category=FutureWarning)
+    warnings.filterwarnings('ignore', category=DeprecationWarning)
+    warnings.filterwarnings('ignore', category=Warning)
+
+    import tensorflow as tf
+    tf.get_logger().setLevel('ERROR')
+    logging.getLogger('tensorflow').setLevel(logging.ERROR)
+    logging.getLogger('absl').setLevel(logging.ERROR)
+
+    from tf_keras.models import load_model
+    return load_model(model_file)
 
 class BlinkClassifier:
     def __init__(self):
         self.model = None
         self.scaler = None
+        self.engine = None # NumpyMLP forward pass, used in preference to the Keras model
         self.dot_threshold = 0.4 # Default backup threshold
+        # Pause timings stored with the model, if any (see model_artifact)
+        self.pause_timing = None
 
     def load_model(self, filepath):
-        """Loads the model and scaler from the user's directory."""
+        """
+        Loads the model and scaler from the user's directory: the single-file
+        <filepath>_model.svm when present (memory-mapped, no scikit-learn or
+        TensorFlow), otherwise the legacy _data.pkl with _weights.npz/_model.h5.
+        """
+        artifact_path = f"{filepath}{MODEL_SUFFIX}"
+        if os.path.exists(artifact_path):
+            try:
+                artifact = read_model_artifact(artifact_path)
+                self.scaler = None
+                self.model = None
+                self.engine = artifact['engine']
+                self.dot_threshold = artifact['dot_threshold']
+                self.pause_timing = artifact['pause_timing']
+                print("User model loaded" + (" (NumPy engine)." if self.engine is not None else ", using threshold method."))
+                return True
+            except Exception as e:
+                print(f"Error loading {artifact_path}: {e}. Trying the legacy model files.")
         try:
             # 1. Load metadata (scaler and backup threshold)
             data_path = f"{filepath}_data.pkl"
@@ -39,18 +72,30 @@ class BlinkClassifier:
 
             self.scaler = model_data['scaler']
             self.dot_threshold = model_data.get('dot_threshold', 0.4)
+            self.model = None
+            self.engine = None
 
-            # 2. Load Keras Model if it exists
+            # 2. Load the network: exported NumPy weights if present and current, else Keras
             if model_data.get('has_model', False):
                 model_file = f"{filepath}_model.h5"
-                try:
-                    self.model = load_model(model_file)
-                    print("Neural network model loaded successfully.")
-                except Exception as keras_e:
-                    print(f"Neural network file missing or corrupted ({model_file}): {keras_e}. Using threshold fallback.")
-                    self.model = None
+                weights_file = f"{filepath}{WEIGHTS_SUFFIX}"
+                if os.path.exists(weights_file) and (not os.path.exists(model_file) or
+                                                     os.path.getmtime(weights_file) >= os.path.getmtime(model_file)):
+                    self.engine = NumpyMLP.load(weights_file)
+                    print("Neural network weights loaded (NumPy engine).")
+                else:
+                    try:
+                        keras_model = load_keras_model(model_file)
+                        self.engine = NumpyMLP.from_keras(keras_model, self.scaler)
+                        # Export once so later loads skip TensorFlow entirely
+                        try:
+                            self.engine.save(weights_file)
+                        except OSError as save_e:
+                            print(f"Could not export weights to {weights_file}: {save_e}")
+                        print("Neural network model loaded and converted to the NumPy engine.")
+                    except Exception as keras_e:
+                        print(f"Neural network file missing or corrupted ({model_file}): {keras_e}. Using threshold fallback.")
             else:
-                self.model = None
                 print("No neural network model found, using threshold method.")
             
             return True
@@ -58,11 +103,13 @@ class BlinkClassifier:
         except FileNotFoundError:
             print(f"Model files not found for {filepath}. User needs training.")
             self.model = None
+            self.engine = None
             self.scaler = None
             return False
         except Exception as e:
             print(f"Error loading model for {filepath}: {e}")
             self.model = None
+            self.engine = None
             self.scaler = None
             return False
 
@@ -78,14 +125,23 @@ class BlinkClassifier:
 
     def predict(self, blink_data):
         """Returns 'dot' or 'dash' based on model or duration threshold."""
-        if self.model is not None and self.scaler is not None:
+        return self.predict_batch([blink_data])[0]
+
+    def predict_batch(self, blinks):
+        """Classifies several blinks with one forward pass. Returns a list of 'dot'/'dash'."""
+        if not blinks:
+            return []
+        if self.engine is not None or (self.model is not None and self.scaler is not None):
             try:
-                features = self.prepare_features(blink_data)
-                features_scaled = self.scaler.transform(features)
-                prediction = self.model.predict(features_scaled, verbose=0)[0][0]
-                return 'dash' if prediction > 0.5 else 'dot'
+                features = np.vstack([self.prepare_features(b) for b in blinks])
+                if self.engine is not None:
+                    predictions = self.engine.predict_proba(features)
+                else:
+                    # Keras model held directly (e.g. right after training in Train.py)
+                    predictions = self.model.predict(self.scaler.transform(features), verbose=0)[:, 0]
+                return ['dash' if p > 0.5 else 'dot' for p in predictions]
             except Exception as e:
                 print(f"Model prediction failed: {e}, using duration threshold fallback.")
         
         # Fallback method if model fails or isn't loaded
-        return 'dash' if blink_data['duration'] > self.dot_threshold else 'dot'
\ No newline at end of file
+        return ['dash' if b['duration'] > self.dot_threshold else 'dot' for b in blinks]
@@ -4,51 +4,110 @@ from collections import deque
 from .morse_decoder import MorseCodeDecoder
 from .blink_detector import BlinkDetector
 from .classifier import BlinkClassifier
+from .pause_timing import PauseTimingEstimator
+from .completion import ACCEPT_PATTERN, WordCompleter
 
 class MorseCodeCommunicator:
-    def __init__(self):
-        self.blink_detector = BlinkDetector()
+    def __init__(self, detector_options=None):
+        self.blink_detector = BlinkDetector(**(detector_options or {}))
         self.morse_decoder = MorseCodeDecoder()
         self.classifier = BlinkClassifier()
         self.current_user = None
         
-        # State variables
-        self.current_morse_sequence = ""
+        # State variables (the letter being entered lives in morse_decoder)
         self.message_accum = ""
         self.last_blink_time = 0
         self.last_letter_time = 0
+        # Word completion for the partial word, refreshed after every letter
+        self.completer = WordCompleter()
+        self.completions = []
         
-        # Timing Constants (will be adaptive after training)
-        self.LETTER_PAUSE = 2.0
-        self.SPACE_PAUSE = 4.0
-        self.BLINK_COOLDOWN = 1.0
+        # Timing constants, adapted to the user's rhythm as they type
+        self.pause_timing = PauseTimingEstimator()
+        self.apply_pause_timing()
 
-    def load_user_profile(self, user_info):
-        """Loads the classifier for the selected user."""
+    def apply_pause_timing(self):
+        timing = self.pause_timing
+        self.LETTER_PAUSE, self.SPACE_PAUSE = timing.letter_pause, timing.space_pause
+
+    def word_history_profile(self):
+        """The user's word counts to persist, or None if no new word was learned."""
+        if not self.completer.dirty:
+            return None
+        self.completer.dirty = False
+        return self.completer.history()
+
+    def partial_word(self):
+        return self.message_accum.rsplit(' ', 1)[-1]
+
+    def pause_timing_profile(self):
+        """Pause timing state to persist with the user profile, or None if nothing new was learned."""
+        if not self.pause_timing.dirty:
+            return None
+        self.pause_timing.dirty = False
+        return self.pause_timing.to_dict()
+
+    def load_user_profile(self, user_info, classifier_cache=None):
+        """
+        Loads the classifier for the selected user. With a ClassifierCache,
+        an already loaded classifier for the same artifacts is reused.
+        The user's learned pause timings are applied whether or not a model
+        is trained.
+        """
+        self.pause_timing = PauseTimingEstimator.from_dict((user_info or {}).get('pause_timing'))
+        self.apply_pause_timing()
+        self.completer = WordCompleter((user_info or {}).get('word_history'))
+        self.completions = []
         if user_info and user_info.get('trained'):
             # Normalize path for cross-platform compatibility
             model_path = os.path.normpath(user_info['model_path'])
-            success = self.classifier.load_model(model_path)
+            if classifier_cache is not None:
+                classifier = classifier_cache.get(self.current_user or model_path, model_path)
+                success = classifier is not None
+                # An untrained or broken profile must not keep the previous user's model
+                self.classifier = classifier if success else BlinkClassifier()
+            else:
+                success = self.classifier.load_model(model_path)
             if success:
                 print(f"User profile loaded from: {model_path}")
+                # Pause timings saved with the model seed users who have none learned yet
+                if not user_info.get('pause_timing') and self.classifier.pause_timing:
+                    self.pause_timing = PauseTimingEstimator.from_dict(self.classifier.pause_timing)
+                    self.apply_pause_timing()
             return success
         return False
 
+    @property
+    def current_morse_sequence(self):
+        return self.morse_decoder.sequence
+
     def reset_state(self):
-        self.current_morse_sequence = ""
+        self.morse_decoder.reset()
+        self.completions = []
         self.message_accum = ""
         self.last_blink_time = 0
         self.last_letter_time = 0
 
-    def process_blink(self, blink_data, blink_type=None):
+    def process_blink(self, blink_data, blink_type=None, now=None):
         """
         Processes a detected blink.
         
         Args:
             blink_data (dict): Contains 'duration', 'timestamp', etc.
             blink_type (str, optional): 'dot' or 'dash'. If None, it will be predicted.
+            now (float, optional): Time of the blink (capture or replay clock). Defaults to time.time().
+
+        Returns ("blink_added", sequence), or ("decoded", result) when the code
+        can't be extended and the letter was committed straight away.
         """
-        self.last_blink_time = time.time()
+        now = time.time() if now is None else now
+        # Learn the user's rhythm from the gap this blink closes
+        if self.current_morse_sequence:
+            self.pause_timing.observe_blink_gap(now - self.last_blink_time)
+        elif self.last_letter_time > 0:
+            self.pause_timing.observe_letter_gap(now - self.last_letter_time,
+                                                 after_space=self.message_accum.endswith(' '))
+        self.last_blink_time = now
         
         # Determine type if not provided (fallback logic)
         if blink_type is None:
@@ -58,44 +117,69 @@ class MorseCodeCommunicator:
                  # Simple duration threshold fallback
                  blink_type = 'dash' if blink_data.get('duration', 0) > 0.4 else 'dot'
 
-        if blink_type == 'dot':
-            self.current_morse_sequence += "."
-        elif blink_type == 'dash':
-            self.current_morse_sequence += "-"
-            
+        if blink_type in ('dot', 'dash'):
+            symbol = '.' if blink_type == 'dot' else '-'
+            sequence = self.current_morse_sequence + symbol
+            decoded_char = self.morse_decoder.feed(symbol)
+            if decoded_char is not None:
+                # No longer code starts with this one: commit without waiting for the letter pause
+                return "decoded", self._commit_letter(decoded_char, sequence, self.last_blink_time)
+
         return "blink_added", self.current_morse_sequence
 
-    def handle_time_based_decoding(self):
-        """Checks if enough time has passed to decode a letter or add a space."""
-        current_time = time.time()
+    def _commit_letter(self, decoded_char, sequence, now):
+        self.message_accum += decoded_char
+        self.last_letter_time = now # Mark when the letter was finished
+        self.pause_timing.update()
+        self.apply_pause_timing()
+        self.completions = self.completer.complete(self.partial_word())
+        return {
+            "status": "decoded",
+            "char": decoded_char,
+            "sequence": sequence,
+            "message": self.message_accum
+        }
+
+    def handle_time_based_decoding(self, now=None):
+        """
+        Checks if enough time has passed to decode a letter or add a space.
+        'now' lets callers drive the pauses from a capture or replay clock.
+        """
+        current_time = time.time() if now is None else now
         time_since_blink = current_time - self.last_blink_time
         
         # 1. Check for Letter Pause (End of sequence -> Decode character)
         if self.current_morse_sequence and time_since_blink > self.LETTER_PAUSE:
-            decoded_char = self.morse_decoder.decode(self.current_morse_sequence)
-            self.message_accum += decoded_char
             sequence_processed = self.current_morse_sequence
-            self.current_morse_sequence = "" # Reset sequence
-            self.last_letter_time = current_time # Mark when the letter was finished
-            
-            return {
-                "status": "decoded", 
-                "char": decoded_char, 
-                "sequence": sequence_processed,
-                "message": self.message_accum
-            }
+            if sequence_processed == ACCEPT_PATTERN and self.completions:
+                self.morse_decoder.reset()
+                return self._accept_completion(current_time)
+            decoded_char = self.morse_decoder.flush()
+            return self._commit_letter(decoded_char, sequence_processed, current_time)
             
         # 2. Check for Space Pause (End of word -> Add space)
         # Condition: We have a message, it doesn't already end in space, 
-        # enough time passed since the last letter was decoded.
+        # no letter is being entered, enough time passed since the last letter was decoded.
         if self.message_accum and not self.message_accum.endswith(' ') and \
+           not self.current_morse_sequence and \
            (current_time - self.last_letter_time > self.SPACE_PAUSE) and \
            (self.last_letter_time > 0):
+            self.completer.learn(self.partial_word())
+            self.completions = []
             self.message_accum += " "
             return {"status": "space_added", "message": self.message_accum}
             
         return {"status": "waiting"}
 
+    def _accept_completion(self, now):
+        """Replaces the partial word with the top completion and ends the word."""
+        word = self.completions[0]
+        self.message_accum = self.message_accum[:len(self.message_accum) - len(self.partial_word())] + word + " "
+        self.completer.learn(word)
+        self.completions = []
+        self.last_letter_time = now
+        return {"status": "completed", "word": word, "message": self.message_accum}
+
     def send_room_control(self, device, action):
         """
         Executes hardware commands.
@@ -0,0 +1,186 @@
+import os
+
+import numpy as np
+
+from .backends import backends
+
+VOCABULARY_PATH = os.path.join("data", "vocabulary.txt")
+INDEX_SUFFIX = "_index.npz"
+# Blink pattern that accepts the top completion. '..--' is not a character
+# in the Morse table (it would decode to '?'), so reserving it costs nothing.
+ACCEPT_PATTERN = "..--"
+
+class CompletionIndex:
+    """
+    Prefix index over words with a frequency count each. Every prefix keeps
+    its top-k words (plus one spare, since a word equal to the prefix is not
+    offered), so a lookup is one dict access. Counts only grow, so adding a
+    word just re-ranks it in the lists of its own prefixes.
+    """
+    def __init__(self, k=5):
+        self.k = k
+        self.counts = {}   # word -> count
+        self.top = {}      # prefix -> words, highest count first
+
+    def __len__(self):
+        return len(self.counts)
+
+    def add(self, word, count=1):
+        total = self.counts.get(word, 0) + count
+        self.counts[word] = total
+        counts = self.counts
+        for i in range(1, len(word) + 1):
+            ranked = self.top.setdefault(word[:i], [])
+            if word in ranked:
+                ranked.remove(word)
+            pos = len(ranked)
+            while pos > 0 and counts[ranked[pos - 1]] < total:
+                pos -= 1
+            if pos <= self.k:
+                ranked.insert(pos, word)
+                del ranked[self.k + 1:]
+
+    @classmethod
+    def from_counts(cls, counts, k=5):
+        """Bulk build: words are visited most frequent first, so each prefix list just fills up."""
+        index = cls(k)
+        index.counts = dict(counts)
+        for word in sorted(index.counts, key=lambda w: (-index.counts[w], w)):
+            for i in range(1, len(word) + 1):
+                ranked = index.top.setdefault(word[:i], [])
+                if len(ranked) <= k:
+                    ranked.append(word)
+        return index
+
+    def complete(self, prefix, k=None):
+        """Up to k words starting with prefix (and longer than it), most frequent first."""
+        return [w for w in self.top.get(prefix, ()) if w != prefix][:k or self.k]
+
+    def save(self, path):
+        """Compact npz: newline-joined words and prefixes plus an int32 table of top-k word ids."""
+        words = list(self.counts)
+        ids = {w: i for i, w in enumerate(words)}
+        prefixes = list(self.top)
+        table = np.full((len(prefixes), self.k + 1), -1, dtype=np.int32)
+        for row, prefix in enumerate(prefixes):
+            ranked = [ids[w] for w in self.top[prefix]]
+            table[row, :len(ranked)] = ranked
+        np.savez(path,
+                 k=np.int32(self.k),
+                 words=np.frombuffer('\n'.join(words).encode('utf-8'), dtype=np.uint8),
+                 counts=np.array([self.counts[w] for w in words], dtype=np.uint32),
+                 prefixes=np.frombuffer('\n'.join(prefixes).encode('utf-8'), dtype=np.uint8),
+                 top=table)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            index = cls(int(data['k']))
+            words = data['words'].tobytes().decode('utf-8').split('\n') if data['words'].size else []
+            prefixes = data['prefixes'].tobytes().decode('utf-8').split('\n') if data['prefixes'].size else []
+            counts = data['counts'].tolist()
+            table = data['top'].tolist()
+        index.counts = dict(zip(words, counts))
+        index.top = {p: [words[i] for i in row if i >= 0] for p, row in zip(prefixes, table)}
+        return index
+
+def read_vocabulary(path):
+    """WORD [COUNT] per line; '#' starts a comment. Words are upper-cased like decoded Morse."""
+    counts = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            fields = line.split('#', 1)[0].split()
+            if not fields:
+                continue
+            word = fields[0].upper()
+            counts[word] = counts.get(word, 0) + (int(fields[1]) if len(fields) > 1 else 1)
+    return counts
+
+def load_vocabulary_index(path=VOCABULARY_PATH):
+    """
+    The base index for the vocabulary file. A prebuilt '<name>_index.npz'
+    next to it is used if it is at least as new; otherwise the index is built
+    from the text file and saved for next time.
+    """
+    index_path = os.path.splitext(path)[0] + INDEX_SUFFIX
+    if os.path.exists(index_path) and (not os.path.exists(path) or
+                                       os.path.getmtime(index_path) >= os.path.getmtime(path)):
+        return CompletionIndex.load(index_path)
+    index = CompletionIndex.from_counts(read_vocabulary(path))
+    try:
+        index.save(index_path)
+    except OSError as e:
+        print(f"Could not save completion index: {e}")
+    return index
+
+# Shared, read-only once loaded; per-user history lives in WordCompleter
+backends.register('vocabulary', load_vocabulary_index)
+
+class WordCompleter:
+    """
+    Completions for the partial word being typed, from the shared vocabulary
+    index and the user's own past words (weighted up by USER_BOOST).
+    """
+    USER_BOOST = 1000   # one use by this user outranks a base count of this much
+    MAX_HISTORY = 2000  # distinct words kept per user
+
+    def __init__(self, word_history=None, k=3):
+        self.k = k
+        self.user_index = CompletionIndex.from_counts(word_history or {}, k)
+        self.base_index = None
+        self.dirty = False
+
+    def _base(self):
+        if self.base_index is None:
+            try:
+                self.base_index = backends.get('vocabulary', block=False)
+            except RuntimeError:
+                self.base_index = CompletionIndex(self.k)
+        return self.base_index
+
+    def complete(self, prefix):
+        if not prefix:
+            return []
+        base = self._base()
+        user_counts = self.user_index.counts
+        candidates = set(self.user_index.complete(prefix, self.k))
+        if base is not None:
+            candidates.update(base.complete(prefix, self.k))
+            base_counts = base.counts
+        else:
+            base_counts = {}
+        return sorted(candidates,
+                      key=lambda w: (-(user_counts.get(w, 0) * self.USER_BOOST + base_counts.get(w, 0)), w))[:self.k]
+
+    def learn(self, word):
+        """Counts a finished word of the user's (only plain letters and digits)."""
+        if word and word.isalnum():
+            self.user_index.add(word)
+            self.dirty = True
+
+    def history(self):
+        """The user's word counts to persist, most used first."""
+        counts = self.user_index.counts
+        kept = sorted(counts, key=lambda w: -counts[w])[:self.MAX_HISTORY]
+        return {w: counts[w] for w in kept}
+
+def main():
+    import argparse
+    import time
+    parser = argparse.ArgumentParser(description="Build the word completion index from a vocabulary file.")
+    parser.add_argument('vocabulary', nargs='?', default=VOCABULARY_PATH)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = CompletionIndex.from_counts(read_vocabulary(args.vocabulary))
+    built = time.perf_counter() - start
+    index_path = os.path.splitext(args.vocabulary)[0] + INDEX_SUFFIX
+    index.save(index_path)
+    start = time.perf_counter()
+    CompletionIndex.load(index_path)
+    loaded = time.perf_counter() - start
+    print(f"{len(index)} words, {len(index.top)} prefixes -> {index_path} "
+          f"({os.path.getsize(index_path) / 1024:.1f} KB); build {built * 1000:.1f} ms, load {loaded * 1000:.1f} ms")
+
+if __name__ == '__main__':
+    main()
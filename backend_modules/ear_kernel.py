@@ -0,0 +1,49 @@
+import numpy as np
+
+# Eye points in EAR order (p1..p6: outer corner, two upper lid, inner corner, two lower lid),
+# left eye first then right eye
+DLIB_EYE_INDICES = tuple(range(36, 42)) + tuple(range(42, 48))
+MEDIAPIPE_EYE_INDICES = (33, 160, 158, 133, 153, 144, 362, 385, 387, 263, 373, 380)
+
+# Point pairs for the two vertical distances (A, B) and the horizontal one (C)
+# of both eyes, as indices into the 12 stacked eye points
+_PAIR_START = np.array([1, 2, 0, 7, 8, 6])
+_PAIR_END = np.array([5, 4, 3, 11, 10, 9])
+
+def dlib_eye_points(shape, indices=DLIB_EYE_INDICES):
+    """(12, 2) float array of the eye landmarks of a dlib full_object_detection."""
+    count = len(indices)
+    # One call into dlib per landmark
+    parts = [shape.part(i) for i in indices]
+    return np.fromiter((v for p in parts for v in (p.x, p.y)),
+                       dtype=np.float64, count=2 * count).reshape(count, 2)
+
+def mediapipe_eye_points(face_landmarks, image_width, image_height, indices=MEDIAPIPE_EYE_INDICES):
+    """(12, 2) float array of eye landmarks in pixels from a MediaPipe NormalizedLandmarkList."""
+    landmarks = face_landmarks.landmark
+    count = len(indices)
+    selected = [landmarks[i] for i in indices]
+    points = np.fromiter((v for p in selected for v in (p.x, p.y)),
+                         dtype=np.float64, count=2 * count).reshape(count, 2)
+    points *= (image_width, image_height)
+    return points
+
+def eye_aspect_ratios(eye_points):
+    """
+    Left/right eye aspect ratios for one frame of eye points, shape (12, 2),
+    or a stacked batch of frames, shape (n, 12, 2). Returns (2,) or (n, 2).
+    An eye with zero width gets an EAR of 0.
+    """
+    pts = np.asarray(eye_points, dtype=np.float64)
+    diff = pts[..., _PAIR_START, :] - pts[..., _PAIR_END, :]
+    dist = np.sqrt((diff * diff).sum(axis=-1)).reshape(pts.shape[:-2] + (2, 3))
+    vertical = dist[..., 0] + dist[..., 1]
+    horizontal = 2.0 * dist[..., 2]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ear = vertical / horizontal
+    ear[horizontal == 0] = 0.0
+    return ear
+
+def mean_ear(eye_points):
+    """Average of the left and right EAR for one frame or a batch of frames."""
+    return eye_aspect_ratios(eye_points).mean(axis=-1)
@@ -0,0 +1,91 @@
+import cv2
+import numpy as np
+from collections import deque
+
+# Enhancement levels, from the averaged frame brightness
+LEVEL_NONE = 0
+LEVEL_DIM = 1    # CLAHE
+LEVEL_DARK = 2   # CLAHE plus the tone curve
+
+def build_tone_lut(gamma=1.0, contrast=1.0, offset=0.0):
+    """256-entry uint8 table for out = contrast * 255 * (in / 255) ** gamma + offset."""
+    x = np.arange(256, dtype=np.float64) / 255.0
+    return np.clip(contrast * 255.0 * np.power(x, gamma) + offset, 0, 255).round().astype(np.uint8)
+
+class LowLightEnhancer:
+    """
+    Low-light enhancement for the blink detector. Brightness is estimated from
+    a subsampled copy of the frame once per frame; the CLAHE instance and tone
+    curve are built once, and the expensive part (CLAHE) is applied only to the
+    face region handed to the landmark model.
+    """
+    def __init__(self, dim_level=80, dark_level=50, clip_limit=3.0, tile_grid=(8, 8),
+                 contrast=1.3, offset=25, gamma=1.0, sample_step=8, history=10):
+        self.dim_level = dim_level
+        self.dark_level = dark_level
+        self.sample_step = sample_step
+        self.clahe = cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=tile_grid)
+        # Same curve as convertScaleAbs(alpha=contrast, beta=offset) when gamma is 1
+        self.tone_lut = build_tone_lut(gamma, contrast, offset)
+        self.brightness_history = deque(maxlen=history)
+        self.brightness = None
+        self.level = LEVEL_NONE
+
+    def reset(self):
+        self.brightness_history.clear()
+        self.brightness = None
+        self.level = LEVEL_NONE
+
+    @property
+    def active(self):
+        return self.level != LEVEL_NONE
+
+    def measure(self, frame):
+        """Updates the running brightness from every sample_step-th pixel. Returns the level."""
+        sample = frame[::self.sample_step, ::self.sample_step]
+        if sample.ndim == 3:
+            # BT.601 luma of the channel means equals the mean of the gray image
+            b, g, r = sample.reshape(-1, 3).mean(axis=0)
+            brightness = 0.114 * b + 0.587 * g + 0.299 * r
+        else:
+            brightness = float(sample.mean())
+        self.brightness_history.append(brightness)
+        self.brightness = float(np.mean(self.brightness_history))
+        if self.brightness < self.dark_level:
+            self.level = LEVEL_DARK
+        elif self.brightness < self.dim_level:
+            self.level = LEVEL_DIM
+        else:
+            self.level = LEVEL_NONE
+        return self.level
+
+    def detection_gray(self, gray):
+        """
+        Full-frame gray image for face search. Only the tone curve (a table
+        lookup) is applied here; HOG normalises local contrast itself.
+        """
+        if self.level == LEVEL_DARK:
+            return cv2.LUT(gray, self.tone_lut)
+        return gray
+
+    def enhance_roi(self, gray_roi):
+        """Enhances a gray crop (the face region) according to the current level."""
+        if self.level == LEVEL_NONE:
+            return gray_roi
+        enhanced = self.clahe.apply(np.ascontiguousarray(gray_roi))
+        if self.level == LEVEL_DARK:
+            cv2.LUT(enhanced, self.tone_lut, dst=enhanced)
+        return enhanced
+
+    def enhance_full(self, frame):
+        """Whole-frame enhancement of a BGR or gray frame, for landmark models that find the face themselves."""
+        if self.level == LEVEL_NONE:
+            return frame
+        if frame.ndim == 2:
+            return self.enhance_roi(frame)
+        lab = cv2.cvtColor(frame, cv2.COLOR_BGR2LAB)
+        lab[:, :, 0] = self.clahe.apply(lab[:, :, 0])
+        enhanced = cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
+        if self.level == LEVEL_DARK:
+            cv2.LUT(enhanced, self.tone_lut, dst=enhanced)
+        return enhanced
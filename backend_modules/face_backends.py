@@ -0,0 +1,191 @@
+import time
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+from .backends import backends
+
+class FaceBackend(ABC):
+    """
+    One way of finding the eyes in a frame. detect() returns the mean EAR, or
+    None when there is no usable face, and leaves the (12, 2) eye points in
+    detector.last_eye_points. Backends share the detector's enhancement and
+    tracking state.
+    """
+    name = None
+    # Entries of the global backend registry this backend needs
+    requires = ()
+
+    def __init__(self, detector):
+        self.detector = detector
+
+    def available(self):
+        """False once a library this backend needs has failed to load."""
+        return not backends.has_failed(*self.requires)
+
+    @abstractmethod
+    def detect(self, frame):
+        pass
+
+class DlibFaceBackend(FaceBackend):
+    name = 'dlib'
+    requires = ('dlib', 'shape_predictor')
+
+    def detect(self, frame):
+        ear, found = self.detector.detect_blink_dlib(frame)
+        return ear if found else None
+
+class MediaPipeFaceBackend(FaceBackend):
+    name = 'mediapipe'
+    requires = ('mediapipe',)
+
+    def detect(self, frame):
+        ear, found = self.detector.detect_blink_mediapipe(frame)
+        return ear if found else None
+
+# name -> FaceBackend subclass; other modules can add their own
+FACE_BACKENDS = {}
+DEFAULT_FACE_BACKENDS = ('dlib', 'mediapipe')
+
+def register_face_backend(cls):
+    FACE_BACKENDS[cls.name] = cls
+    return cls
+
+register_face_backend(DlibFaceBackend)
+register_face_backend(MediaPipeFaceBackend)
+
+class BackendStats:
+    def __init__(self):
+        self.attempts = 0
+        self.successes = 0
+        self.seconds = 0.0
+
+    def as_dict(self):
+        return {
+            'attempts': self.attempts,
+            'successes': self.successes,
+            'success_rate': self.successes / self.attempts if self.attempts else 0.0,
+            'mean_ms': self.seconds / self.attempts * 1000 if self.attempts else 0.0
+        }
+
+class FaceBackendSelector:
+    """
+    Runs a frame through the face backends in preference order, with hysteresis:
+
+    1. The backend that found the face last ('current') is tried first, so a
+       working fallback is not preceded by a failing primary every frame.
+    2. Another backend only takes over after the current one has missed
+       switch_after frames in a row; until then a frame it misses is still
+       offered to the others.
+    3. While on a fallback, the preferred backend is probed every
+       probe_interval frames and takes back over when it finds the face.
+    4. After no_face_after frames where no backend found a face, detection
+       backs off: only every 2nd, 4th, ... up to max_skip-th frame is examined,
+       unless a cheap subsampled frame difference shows movement.
+    """
+    def __init__(self, detector, names=DEFAULT_FACE_BACKENDS, switch_after=3, probe_interval=30,
+                 no_face_after=5, max_skip=8, motion_threshold=6.0, motion_step=16):
+        self.detector = detector
+        self.backends = [FACE_BACKENDS[name](detector) for name in names]
+        self.stats = {b.name: BackendStats() for b in self.backends}
+        self.switch_after = switch_after
+        self.probe_interval = probe_interval
+        self.no_face_after = no_face_after
+        self.max_skip = max_skip
+        self.motion_threshold = motion_threshold  # mean absolute difference, in gray levels
+        self.motion_step = motion_step
+        self.switches = 0
+        self.frames_skipped = 0
+        self.reset()
+
+    def reset(self):
+        self.current = self.backends[0] if self.backends else None
+        self.current_misses = 0
+        self.frames_on_fallback = 0
+        self.no_face_frames = 0
+        self.skip = 1
+        self.frames_since_attempt = 0
+        self.motion_sample = None
+
+    def _attempt(self, backend, frame):
+        stats = self.stats[backend.name]
+        start = time.perf_counter()
+        with self.detector.metrics.timer(backend.name):
+            ear = backend.detect(frame)
+        stats.seconds += time.perf_counter() - start
+        stats.attempts += 1
+        if ear is not None:
+            stats.successes += 1
+        return ear
+
+    def _moved(self, frame):
+        """Cheap change test on a coarse grid of pixels, used while no face is present."""
+        sample = frame[::self.motion_step, ::self.motion_step].astype(np.int16)
+        previous = self.motion_sample
+        self.motion_sample = sample
+        if previous is None or previous.shape != sample.shape:
+            return True
+        return float(np.abs(sample - previous).mean()) > self.motion_threshold
+
+    def _should_skip(self, frame):
+        if self.no_face_frames < self.no_face_after:
+            return False
+        self.frames_since_attempt += 1
+        if self._moved(frame) or self.frames_since_attempt >= self.skip:
+            self.frames_since_attempt = 0
+            return False
+        return True
+
+    def _order(self):
+        preferred = self.backends[0]
+        if self.current is preferred:
+            return self.backends
+        self.frames_on_fallback += 1
+        if self.frames_on_fallback % self.probe_interval == 0:
+            first = [preferred, self.current]
+        else:
+            first = [self.current]
+        return first + [b for b in self.backends if b not in first]
+
+    def _switch(self, backend):
+        if backend is not self.current:
+            self.current = backend
+            self.switches += 1
+            self.frames_on_fallback = 0
+        self.current_misses = 0
+
+    def detect(self, frame):
+        """Mean EAR from the first backend that finds a face, or None."""
+        if self._should_skip(frame):
+            self.frames_skipped += 1
+            return None
+
+        for backend in self._order():
+            if not backend.available():
+                if backend is self.current:
+                    self.current_misses = self.switch_after
+                continue
+            ear = self._attempt(backend, frame)
+            if ear is not None:
+                if backend is self.current or backend is self.backends[0] \
+                        or self.current_misses >= self.switch_after:
+                    self._switch(backend)
+                self.no_face_frames = 0
+                self.skip = 1
+                self.motion_sample = None
+                return ear
+            if backend is self.current:
+                self.current_misses += 1
+
+        self.no_face_frames += 1
+        if self.no_face_frames > self.no_face_after:
+            self.skip = min(self.max_skip, self.skip * 2)
+        return None
+
+    def get_stats(self):
+        return {
+            'current': self.current.name if self.current else None,
+            'switches': self.switches,
+            'frames_skipped': self.frames_skipped,
+            'backends': {name: stats.as_dict() for name, stats in self.stats.items()}
+        }
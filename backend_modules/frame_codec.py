@@ -0,0 +1,94 @@
+import struct
+import base64
+
+import cv2
+import numpy as np
+
+# Binary frame packet sent by static/js/webcam.js on the 'frame_bin' event:
+#   uint8   version
+#   uint8   format       (FORMAT_JPEG or FORMAT_GRAY8)
+#   uint16  width
+#   uint16  height
+#   uint16  reserved
+#   uint32  sequence number
+#   float64 capture timestamp (ms since epoch, client clock)
+# followed by the payload (JPEG bytes or width*height grayscale pixels).
+# All fields are little-endian.
+HEADER_FORMAT = '<BBHHHId'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+PACKET_VERSION = 1
+
+FORMAT_JPEG = 0
+FORMAT_GRAY8 = 1
+
+class FrameDecodeError(ValueError):
+    pass
+
+def parse_header(packet):
+    if not isinstance(packet, (bytes, bytearray, memoryview)):
+        raise FrameDecodeError(f"Packet must be bytes, got {type(packet).__name__}")
+    if len(packet) < HEADER_SIZE:
+        raise FrameDecodeError(f"Packet too short ({len(packet)} bytes)")
+    version, fmt, width, height, _, seq, timestamp = struct.unpack_from(HEADER_FORMAT, packet, 0)
+    if version != PACKET_VERSION:
+        raise FrameDecodeError(f"Unsupported packet version {version}")
+    return {'format': fmt, 'width': width, 'height': height, 'seq': seq, 'timestamp': timestamp}
+
+def decode_frame_packet(packet, out=None):
+    """
+    Decodes a binary frame packet straight from the received buffer.
+    Returns (header, frame); frame is BGR for JPEG payloads and a 2-D
+    grayscale array for raw pixel payloads.
+
+    out(shape), if given, returns a preallocated array that grayscale
+    payloads are copied into. JPEG payloads always get a new array
+    (cv2.imdecode has no destination argument in Python).
+    """
+    header = parse_header(packet)
+    # Views into the received buffer, no intermediate copies
+    payload = np.frombuffer(packet, np.uint8, offset=HEADER_SIZE)
+
+    if header['format'] == FORMAT_JPEG:
+        if payload.size == 0:
+            raise FrameDecodeError("Empty JPEG payload")
+        try:
+            frame = cv2.imdecode(payload, cv2.IMREAD_COLOR)
+        except cv2.error as e:
+            raise FrameDecodeError(f"Invalid JPEG payload: {e}") from e
+        if frame is None:
+            raise FrameDecodeError("Invalid JPEG payload")
+    elif header['format'] == FORMAT_GRAY8:
+        expected = header['width'] * header['height']
+        if payload.size != expected:
+            raise FrameDecodeError(f"Expected {expected} pixels, got {payload.size}")
+        frame = payload.reshape(header['height'], header['width'])
+        if out is not None:
+            dst = out(frame.shape)
+            np.copyto(dst, frame)
+            frame = dst
+        elif not frame.flags.writeable:
+            # Socket.IO hands us immutable bytes; dlib and in-place enhancement need a writable array
+            frame = frame.copy()
+    else:
+        raise FrameDecodeError(f"Unknown frame format {header['format']}")
+    return header, frame
+
+def decode_data_url(img_str):
+    """Legacy path: decodes a base64 JPEG data URL sent on the 'frame' event."""
+    if ',' in img_str:
+        img_str = img_str.split(',', 1)[1]
+    img_bytes = base64.b64decode(img_str)
+    return cv2.imdecode(np.frombuffer(img_bytes, np.uint8), cv2.IMREAD_COLOR)
+
+def encode_frame_packet(frame, seq=0, timestamp=0.0, fmt=FORMAT_JPEG, quality=50):
+    """Builds a packet in the client's format (used by tools and recordings)."""
+    height, width = frame.shape[:2]
+    if fmt == FORMAT_JPEG:
+        ok, buf = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        if not ok:
+            raise FrameDecodeError("JPEG encoding failed")
+        payload = buf.tobytes()
+    else:
+        gray = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        payload = np.ascontiguousarray(gray).tobytes()
+    return struct.pack(HEADER_FORMAT, PACKET_VERSION, fmt, width, height, 0, seq, timestamp) + payload
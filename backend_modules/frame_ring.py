@@ -0,0 +1,70 @@
+import numpy as np
+
+class FrameRing:
+    """
+    Fixed set of frame buffers for one session, shared by the socket handlers
+    (writers) and the pool worker (reader). Each slot is free, being written,
+    the latest frame (published, not processed yet) or being read. Writers
+    never get the latest or the reading slot, so a frame is decoded into its
+    slot once and processed from there without copies.
+
+    Buffers are allocated for the first frame and again only when the frame
+    size changes. Decoders that can't write into a buffer (JPEG) still
+    allocate an array per frame; store() copies it into the slot, so the
+    ring itself stays fixed, and counts that array in allocations.
+    Not thread-safe by itself: ProcessingSession calls it under
+    its frame_lock (except buffer(), which touches only the caller's slot).
+    """
+    def __init__(self, slots=4):
+        self.buffers = [None] * slots
+        self.free = list(range(slots))
+        self.latest = None
+        self.reading = None
+        self.allocations = 0
+
+    def acquire(self):
+        """A free slot to write into, or None if all are in use."""
+        return self.free.pop() if self.free else None
+
+    def buffer(self, slot, shape):
+        """The slot's array for a frame of this shape, reallocated only when the shape changes."""
+        buf = self.buffers[slot]
+        if buf is None or buf.shape != shape:
+            buf = self.buffers[slot] = np.empty(shape, np.uint8)
+            self.allocations += 1
+        return buf
+
+    def store(self, slot, frame):
+        """Copies an array decoded elsewhere into the slot's buffer (counted as one allocation)."""
+        np.copyto(self.buffer(slot, frame.shape), frame)
+        self.allocations += 1
+
+    def release(self, slot):
+        self.free.append(slot)
+
+    def publish(self, slot):
+        """Makes slot the latest frame. Returns True if an unread frame was replaced."""
+        replaced = self.latest is not None
+        if replaced:
+            self.free.append(self.latest)
+        self.latest = slot
+        return replaced
+
+    def has_latest(self):
+        return self.latest is not None
+
+    def take(self):
+        """The latest frame, owned by the reader until the next take; None if nothing new."""
+        if self.latest is None:
+            return None
+        if self.reading is not None:
+            self.free.append(self.reading)
+        self.reading, self.latest = self.latest, None
+        return self.buffers[self.reading]
+
+    def clear(self):
+        """Drops all buffers; slots in use return to the free list."""
+        self.buffers = [None] * len(self.buffers)
+        self.free = list(range(len(self.buffers)))
+        self.latest = None
+        self.reading = None
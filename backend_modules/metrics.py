@@ -0,0 +1,189 @@
+import bisect
+import threading
+import time
+from collections import deque
+
+# Histogram bucket upper bounds in seconds (Prometheus 'le' labels)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+METRIC_PREFIX = 'silentvoice'
+
+class Histogram:
+    """Fixed-bucket histogram: memory stays bounded however many values are observed."""
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            yield bound, total
+
+class RateMeter:
+    """Events per second over the most recent events."""
+    def __init__(self, window=64):
+        self.times = deque(maxlen=window)
+
+    def mark(self, now):
+        self.times.append(now)
+
+    def rate(self, now, max_age=2.0):
+        # No recent events means the stream is idle, not running at the old rate
+        if len(self.times) < 2 or now - self.times[-1] > max_age:
+            return 0.0
+        span = self.times[-1] - self.times[0]
+        return (len(self.times) - 1) / span if span > 0 else 0.0
+
+class StageTimer:
+    __slots__ = ('registry', 'name', 'start')
+
+    def __init__(self, registry, name):
+        self.registry = registry
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.registry.observe(self.name, time.perf_counter() - self.start)
+        return False
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NULL_TIMER = _NullTimer()
+
+class MetricsRegistry:
+    """
+    Stage latency histograms, counters, gauges and rate meters for one scope
+    (the whole server, or one session). Observations made on a registry with
+    a parent are also recorded on the parent, so per-session registries feed
+    the global one.
+    """
+    def __init__(self, labels=None, parent=None, enabled=True):
+        self.labels = labels or {}
+        self.parent = parent
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+        self.gauges = {}
+        self.meters = {}
+
+    def timer(self, stage):
+        """Context manager timing one stage. A no-op when metrics are disabled."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return StageTimer(self, stage)
+
+    def observe(self, stage, seconds):
+        if not self.enabled:
+            return
+        with self.lock:
+            hist = self.histograms.get(stage)
+            if hist is None:
+                hist = self.histograms[stage] = Histogram()
+            hist.observe(seconds)
+        if self.parent:
+            self.parent.observe(stage, seconds)
+
+    def inc(self, name, amount=1):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+        if self.parent:
+            self.parent.inc(name, amount)
+
+    def set_gauge(self, name, value):
+        with self.lock:
+            self.gauges[name] = value
+
+    def mark(self, name, now=None):
+        if not self.enabled:
+            return
+        now = time.time() if now is None else now
+        with self.lock:
+            meter = self.meters.get(name)
+            if meter is None:
+                meter = self.meters[name] = RateMeter()
+            meter.mark(now)
+        if self.parent:
+            self.parent.mark(name, now)
+
+    def rate(self, name, now=None):
+        now = time.time() if now is None else now
+        with self.lock:
+            meter = self.meters.get(name)
+            return meter.rate(now) if meter else 0.0
+
+# Shared disabled registry used by components that were not given one
+NULL_METRICS = MetricsRegistry(enabled=False)
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    parts = []
+    for key, value in labels.items():
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{key}="{value}"')
+    return '{' + ','.join(parts) + '}'
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def render_prometheus(registries):
+    """Renders registries in the Prometheus text exposition format (version 0.0.4)."""
+    now = time.time()
+    snapshots = []
+    for registry in registries:
+        with registry.lock:
+            snapshots.append((
+                registry.labels,
+                {k: (list(h.cumulative()), h.sum, h.count) for k, h in registry.histograms.items()},
+                dict(registry.counters),
+                dict(registry.gauges),
+                {k: m.rate(now) for k, m in registry.meters.items()},
+            ))
+
+    lines = []
+    name = f'{METRIC_PREFIX}_stage_seconds'
+    lines.append(f'# HELP {name} Processing latency per pipeline stage.')
+    lines.append(f'# TYPE {name} histogram')
+    for labels, histograms, _, _, _ in snapshots:
+        for stage, (buckets, total, count) in sorted(histograms.items()):
+            base = dict(labels, stage=stage)
+            for bound, cumulative in buckets:
+                lines.append(f'{name}_bucket{_format_labels(dict(base, le=_format_value(bound)))} {cumulative}')
+            lines.append(f'{name}_sum{_format_labels(base)} {_format_value(total)}')
+            lines.append(f'{name}_count{_format_labels(base)} {count}')
+
+    families = {}
+    for labels, _, counters, gauges, rates in snapshots:
+        for key, value in counters.items():
+            families.setdefault((f'{METRIC_PREFIX}_{key}_total', 'counter'), []).append((labels, value))
+        for key, value in gauges.items():
+            families.setdefault((f'{METRIC_PREFIX}_{key}', 'gauge'), []).append((labels, value))
+        for key, value in rates.items():
+            families.setdefault((f'{METRIC_PREFIX}_{key}_per_second', 'gauge'), []).append((labels, value))
+    for (family, kind), samples in sorted(families.items()):
+        lines.append(f'# TYPE {family} {kind}')
+        for labels, value in samples:
+            lines.append(f'{family}{_format_labels(labels)} {_format_value(value)}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,94 @@
+import os
+import sys
+
+import numpy as np
+
+# Exported weights live next to the other user artifacts: <model_path>_weights.npz
+WEIGHTS_SUFFIX = '_weights.npz'
+
+_ACTIVATIONS = {
+    'linear': lambda x: x,
+    'relu': lambda x: np.maximum(x, 0.0),
+    'tanh': np.tanh,
+    'sigmoid': lambda x: 1.0 / (1.0 + np.exp(-np.clip(x, -500.0, 500.0))),
+}
+
+class NumpyMLP:
+    """
+    Forward pass of the per-user dot/dash network (StandardScaler followed by
+    dense layers) in plain NumPy. Matches the Keras model to float tolerance
+    at a tiny fraction of model.predict's per-call cost.
+    """
+    def __init__(self, weights, biases, activations, scaler_mean, scaler_scale):
+        for name in activations:
+            if name not in _ACTIVATIONS:
+                raise ValueError(f"Unsupported activation: {name}")
+        self.weights = [np.asarray(w, dtype=np.float64) for w in weights]
+        self.biases = [np.asarray(b, dtype=np.float64) for b in biases]
+        self.activations = list(activations)
+        self._activation_fns = [_ACTIVATIONS[name] for name in activations]
+        self.scaler_mean = np.asarray(scaler_mean, dtype=np.float64)
+        self.scaler_scale = np.asarray(scaler_scale, dtype=np.float64)
+
+    def predict_proba(self, features):
+        """Returns the network output for a (n_samples, n_features) array (or one sample) as a 1-D array."""
+        x = (np.atleast_2d(np.asarray(features, dtype=np.float64)) - self.scaler_mean) / self.scaler_scale
+        for w, b, act in zip(self.weights, self.biases, self._activation_fns):
+            x = act(x @ w + b)
+        return x[:, 0]
+
+    @classmethod
+    def from_keras(cls, model, scaler):
+        """Builds the engine from a trained Keras model and its fitted StandardScaler."""
+        weights, biases, activations = [], [], []
+        for layer in model.layers:
+            params = layer.get_weights()
+            if not params:
+                # Dropout and other parameter-free layers are identity at inference
+                continue
+            weights.append(params[0])
+            biases.append(params[1])
+            activations.append(layer.get_config().get('activation', 'linear'))
+        # StandardScaler already maps zero-variance features to a scale of 1
+        scale = scaler.scale_ if scaler.scale_ is not None else np.ones_like(scaler.mean_)
+        return cls(weights, biases, activations, scaler.mean_, scale)
+
+    def save(self, path):
+        arrays = {'activations': np.array(self.activations), 'scaler_mean': self.scaler_mean, 'scaler_scale': self.scaler_scale}
+        for i, (w, b) in enumerate(zip(self.weights, self.biases)):
+            arrays[f'W{i}'] = w
+            arrays[f'b{i}'] = b
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            activations = [str(a) for a in data['activations']]
+            weights = [data[f'W{i}'] for i in range(len(activations))]
+            biases = [data[f'b{i}'] for i in range(len(activations))]
+            return cls(weights, biases, activations, data['scaler_mean'], data['scaler_scale'])
+
+def export_user_model(filepath):
+    """
+    Converts an existing <filepath>_model.h5 + <filepath>_data.pkl pair into
+    <filepath>_weights.npz. Needs TensorFlow, but only once per model.
+    """
+    import pickle
+    from .classifier import load_keras_model
+
+    with open(f"{filepath}_data.pkl", 'rb') as f:
+        model_data = pickle.load(f)
+    model = load_keras_model(f"{filepath}_model.h5")
+    engine = NumpyMLP.from_keras(model, model_data['scaler'])
+    engine.save(f"{filepath}{WEIGHTS_SUFFIX}")
+    return engine
+
+if __name__ == '__main__':
+    # Usage: python -m backend_modules.mlp_engine users/MG_model [...]
+    if len(sys.argv) < 2:
+        print("Usage: python -m backend_modules.mlp_engine <model_path> [<model_path> ...]")
+        sys.exit(1)
+    for model_path in sys.argv[1:]:
+        model_path = os.path.normpath(model_path)
+        export_user_model(model_path)
+        print(f"Exported {model_path}{WEIGHTS_SUFFIX}")
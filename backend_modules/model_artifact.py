@@ -0,0 +1,170 @@
+import json
+import os
+import struct
+import sys
+import zlib
+
+import numpy as np
+
+from .mlp_engine import NumpyMLP, WEIGHTS_SUFFIX
+
+# One file per trained user: <model_path>_model.svm
+MODEL_SUFFIX = '_model.svm'
+
+# Layout (little-endian, every section 8-byte aligned so arrays map in place):
+#   header    8s magic, uint16 version, uint16 reserved, uint32 layers,
+#             uint32 features, uint32 meta length, float64 dot threshold,
+#             uint64 body length, uint32 crc32 of the body, uint32 reserved
+#   body      layer table: uint32 (inputs, outputs) per layer
+#             metadata: UTF-8 JSON (activations, pause timings), zero padded
+#             float64 scaler mean[features], scaler scale[features]
+#             float64 W[inputs*outputs] and b[outputs] per layer
+MAGIC = b'SVMODEL\0'
+FORMAT_VERSION = 1
+HEADER_FORMAT = '<8sHHIIIdQII'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+class ModelArtifactError(ValueError):
+    pass
+
+def _pad(data):
+    return data + b'\0' * (-len(data) % 8)
+
+def write_model_artifact(path, dot_threshold, scaler_mean, scaler_scale, engine=None, pause_timing=None):
+    """
+    Writes a user model: scaler statistics, the threshold fallback, the
+    network (None for threshold-only models) and optional pause timings.
+    The file is replaced atomically, so a server mapping the old file keeps
+    a consistent copy.
+    """
+    scaler_mean = np.asarray(scaler_mean, dtype='<f8')
+    scaler_scale = np.asarray(scaler_scale, dtype='<f8')
+    weights = engine.weights if engine is not None else []
+    biases = engine.biases if engine is not None else []
+    meta = {'activations': engine.activations if engine is not None else []}
+    if pause_timing:
+        meta['pause_timing'] = pause_timing
+
+    table = b''.join(struct.pack('<II', *np.shape(w)) for w in weights)
+    meta_bytes = json.dumps(meta).encode('utf-8')
+    arrays = [scaler_mean, scaler_scale]
+    for w, b in zip(weights, biases):
+        arrays += [np.asarray(w, dtype='<f8'), np.asarray(b, dtype='<f8')]
+    body = table + _pad(meta_bytes) + b''.join(a.tobytes() for a in arrays)
+    header = struct.pack(HEADER_FORMAT, MAGIC, FORMAT_VERSION, 0, len(weights), scaler_mean.size, len(meta_bytes),
+                         float(dot_threshold), len(body), zlib.crc32(body), 0)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        f.write(body)
+    os.replace(tmp_path, path)
+
+def read_model_artifact(path):
+    """
+    Maps a user model file (reads it on Windows) and returns a dict with 'dot_threshold',
+    'scaler_mean', 'scaler_scale', 'engine' (NumpyMLP or None) and
+    'pause_timing' (or None). Arrays are read-only views of the mapping.
+    Raises ModelArtifactError if the file is not a valid artifact.
+    """
+    if os.name == 'nt':
+        # Windows can't replace a file that is mapped, which would block retraining while the server runs
+        data = np.fromfile(path, dtype=np.uint8)
+    else:
+        data = np.memmap(path, dtype=np.uint8, mode='r')
+    if data.size < HEADER_SIZE:
+        raise ModelArtifactError("file too short")
+    magic, version, _, layers, features, meta_length, dot_threshold, body_length, crc, _ = \
+        struct.unpack_from(HEADER_FORMAT, data, 0)
+    if magic != MAGIC:
+        raise ModelArtifactError("not a model artifact")
+    if version != FORMAT_VERSION:
+        raise ModelArtifactError(f"unsupported version {version}")
+    body = data[HEADER_SIZE:]
+    if body.size != body_length or zlib.crc32(body) != crc:
+        raise ModelArtifactError("checksum mismatch")
+
+    offset = HEADER_SIZE
+    shapes = [struct.unpack_from('<II', data, offset + 8 * i) for i in range(layers)]
+    offset += 8 * layers
+    meta = json.loads(data[offset:offset + meta_length].tobytes().decode('utf-8'))
+    offset += meta_length + (-meta_length % 8)
+
+    def take(count):
+        nonlocal offset
+        array = np.frombuffer(data, dtype='<f8', count=count, offset=offset)
+        offset += count * 8
+        return array
+
+    scaler_mean = take(features)
+    scaler_scale = take(features)
+    engine = None
+    if layers:
+        weights, biases = [], []
+        for inputs, outputs in shapes:
+            weights.append(take(inputs * outputs).reshape(inputs, outputs))
+            biases.append(take(outputs))
+        engine = NumpyMLP(weights, biases, meta['activations'], scaler_mean, scaler_scale)
+    return {
+        'dot_threshold': dot_threshold,
+        'scaler_mean': scaler_mean,
+        'scaler_scale': scaler_scale,
+        'engine': engine,
+        'pause_timing': meta.get('pause_timing')
+    }
+
+def convert_user_model(filepath, pause_timing=None):
+    """
+    Writes <filepath>_model.svm from the legacy artifacts: _data.pkl (needs
+    scikit-learn to unpickle the scaler) plus _weights.npz, or _model.h5
+    (needs TensorFlow) when no exported weights exist.
+    """
+    import pickle
+    with open(f"{filepath}_data.pkl", 'rb') as f:
+        model_data = pickle.load(f)
+    scaler = model_data['scaler']
+    engine = None
+    if model_data.get('has_model', False):
+        weights_file = f"{filepath}{WEIGHTS_SUFFIX}"
+        if os.path.exists(weights_file):
+            engine = NumpyMLP.load(weights_file)
+        else:
+            from .mlp_engine import export_user_model
+            engine = export_user_model(filepath)
+    scale = scaler.scale_ if scaler.scale_ is not None else np.ones_like(scaler.mean_)
+    path = f"{filepath}{MODEL_SUFFIX}"
+    write_model_artifact(path, model_data.get('dot_threshold', 0.4), scaler.mean_, scale, engine, pause_timing)
+    return path
+
+def main():
+    import argparse
+    import time
+    from .user_manager import UserManager
+
+    parser = argparse.ArgumentParser(description="Convert user models (_data.pkl + _weights.npz/_model.h5) to one _model.svm file.")
+    parser.add_argument('model_paths', nargs='*', help="Model prefixes, e.g. users/MG_model")
+    parser.add_argument('--all', action='store_true', help="Convert every trained user in the user store")
+    args = parser.parse_args()
+
+    targets = [(os.path.normpath(p.replace('\\', '/')), None) for p in args.model_paths]
+    if args.all:
+        user_manager = UserManager()
+        for username in user_manager.list_users():
+            info = user_manager.get_user(username)
+            if info and info.get('trained'):
+                targets.append((os.path.normpath(info['model_path']), info.get('pause_timing')))
+    if not targets:
+        parser.print_usage()
+        sys.exit(1)
+    for model_path, pause_timing in targets:
+        try:
+            path = convert_user_model(model_path, pause_timing)
+        except Exception as e:
+            print(f"{model_path}: conversion failed: {e}")
+            continue
+        start = time.perf_counter()
+        read_model_artifact(path)
+        print(f"Wrote {path} ({os.path.getsize(path)} bytes, loads in {(time.perf_counter() - start) * 1e6:.0f} us)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+import os
+import threading
+from collections import OrderedDict
+
+from .classifier import BlinkClassifier
+from .model_artifact import MODEL_SUFFIX
+
+# Files that make up a trained user model; any change to them invalidates the cache entry
+ARTIFACT_SUFFIXES = (MODEL_SUFFIX, '_data.pkl', '_model.h5', '_weights.npz')
+
+def artifact_signature(model_path):
+    """(suffix, mtime_ns, size) of every artifact present, so retraining is detected."""
+    signature = []
+    for suffix in ARTIFACT_SUFFIXES:
+        try:
+            st = os.stat(f"{model_path}{suffix}")
+        except OSError:
+            continue
+        signature.append((suffix, st.st_mtime_ns, st.st_size))
+    return tuple(signature)
+
+def estimate_classifier_bytes(classifier):
+    """Rough resident size of a loaded classifier."""
+    size = 4096  # object, scaler and bookkeeping overhead
+    if classifier.engine is not None:
+        size += sum(a.nbytes for a in classifier.engine.weights + classifier.engine.biases)
+    if classifier.model is not None:
+        # Keras keeps weights plus optimizer/graph state; assume a few copies
+        size += classifier.model.count_params() * 4 * 3
+    return size
+
+class ClassifierCache:
+    """
+    Bounded LRU of ready-to-run BlinkClassifiers keyed by username, validated
+    against the artifact files' mtime/size. Loaded classifiers only read their
+    weights, so sessions of the same user share one instance.
+    """
+    def __init__(self, max_entries=16, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # username -> (model_path, signature, classifier, size)
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, username, model_path):
+        """Returns a loaded classifier for the user, or None if the model can't be loaded."""
+        signature = artifact_signature(model_path)
+        with self.lock:
+            entry = self.entries.get(username)
+            if entry and entry[0] == model_path and entry[1] == signature:
+                self.entries.move_to_end(username)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+
+        # Load outside the lock so other users' lookups are not held up
+        classifier = BlinkClassifier()
+        if not classifier.load_model(model_path):
+            self.invalidate(username)
+            return None
+        # Loading may have exported new weights; key on what is on disk now
+        self.put(username, model_path, artifact_signature(model_path), classifier)
+        return classifier
+
+    def put(self, username, model_path, signature, classifier):
+        size = estimate_classifier_bytes(classifier)
+        with self.lock:
+            old = self.entries.pop(username, None)
+            if old:
+                self.total_bytes -= old[3]
+            self.entries[username] = (model_path, signature, classifier, size)
+            self.total_bytes += size
+            # Evict least recently used entries beyond the count or memory budget
+            while len(self.entries) > 1 and (len(self.entries) > self.max_entries or self.total_bytes > self.max_bytes):
+                _, evicted = self.entries.popitem(last=False)
+                self.total_bytes -= evicted[3]
+                self.evictions += 1
+
+    def invalidate(self, username):
+        with self.lock:
+            entry = self.entries.pop(username, None)
+            if entry:
+                self.total_bytes -= entry[3]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
+
+    def preload(self, user_manager, count):
+        """Loads the most recently used trained profiles (e.g. at startup). Returns the names loaded."""
+        loaded = []
+        for username in user_manager.recent_users(count):
+            user_info = user_manager.get_user(username)
+            if user_info and user_info.get('trained'):
+                if self.get(username, os.path.normpath(user_info['model_path'])) is not None:
+                    loaded.append(username)
+        return loaded
+
+    def stats(self):
+        with self.lock:
+            return {
+                'entries': len(self.entries),
+                'bytes': self.total_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
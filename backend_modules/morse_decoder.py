@@ -1,3 +1,11 @@
+class MorseTrieNode:
+    __slots__ = ('children', 'char', 'candidates')
+
+    def __init__(self):
+        self.children = {}      # '.' / '-' -> MorseTrieNode
+        self.char = None        # character whose code ends here
+        self.candidates = ()    # every character reachable from here, shortest code first
+
 class MorseCodeDecoder:
     def __init__(self):
         self.morse_code_dict = {
@@ -15,6 +23,61 @@ class MorseCodeDecoder:
             '-....-': '-', '..--.-': '_', '.-..-.': '"', '...-..-': '$',
             '.--.-.': '@', '....-...': 'SOS'
         }
+        self.root = self._build_trie(self.morse_code_dict)
+        # Streaming state: the code fed so far and its trie node
+        self.sequence = ""
+        self.node = self.root
+
+    @staticmethod
+    def _build_trie(code_dict):
+        root = MorseTrieNode()
+        for code, char in code_dict.items():
+            node = root
+            for symbol in code:
+                node = node.children.setdefault(symbol, MorseTrieNode())
+            node.char = char
+
+        def collect(node, depth):
+            found = [(depth, node.char)] if node.char is not None else []
+            for child in node.children.values():
+                found.extend(collect(child, depth + 1))
+            node.candidates = tuple(char for _, char in sorted(found, key=lambda item: item[0]))
+            return found
+
+        collect(root, 0)
+        return root
 
     def decode(self, morse_sequence):
-        return self.morse_code_dict.get(morse_sequence, '?')
\ No newline at end of file
+        return self.morse_code_dict.get(morse_sequence, '?')
+
+    def reset(self):
+        self.sequence = ""
+        self.node = self.root
+
+    def feed(self, symbol):
+        """
+        Adds one '.' or '-' to the current letter. Returns the decoded character
+        as soon as the code can't be extended to any other code (a leaf, or a
+        sequence that matches nothing, which decodes to '?'), else None.
+        """
+        self.sequence += symbol
+        self.node = self.node.children.get(symbol)
+        if self.node is None or not self.node.children:
+            return self.flush()
+        return None
+
+    def flush(self):
+        """Decodes and clears the current letter (e.g. after the letter pause). None if it is empty."""
+        if not self.sequence:
+            return None
+        char = self.node.char if self.node is not None and self.node.char is not None else '?'
+        self.reset()
+        return char
+
+    def candidates(self):
+        """Characters the current letter can still become, shortest code first."""
+        return self.node.candidates if self.sequence else ()
+
+    def current_char(self):
+        """Character the current letter decodes to if it ends now, or None."""
+        return self.node.char
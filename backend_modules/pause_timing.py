@@ -0,0 +1,100 @@
+from collections import deque
+
+import numpy as np
+
+class PauseTimingEstimator:
+    """
+    Learns a user's Morse rhythm from live input and derives the pause
+    thresholds the communicator decodes with:
+
+    - blink gaps: time between blinks inside one letter. LETTER_PAUSE must
+      sit safely above these, or letters get cut in two.
+    - letter gaps: time from one letter being committed to the first blink
+      of the next letter in the same word. SPACE_PAUSE must sit above these.
+    - word gaps: the same, across an automatic space (kept for reporting).
+
+    Gaps are measured between blink end times, the same clock the pauses are
+    checked against. Thresholds move towards their targets gradually and are
+    clamped, so a few odd gaps can't make decoding erratic.
+    """
+    DEFAULT_LETTER_PAUSE = 2.0
+    DEFAULT_SPACE_PAUSE = 4.0
+
+    MAX_SAMPLES = 200        # most recent gaps kept per kind
+    MIN_BLINK_GAPS = 20      # before LETTER_PAUSE adapts
+    MIN_LETTER_GAPS = 10     # before SPACE_PAUSE adapts
+    MARGIN = 1.3             # relative safety margin over the gap quantile
+    MARGIN_SECONDS = 0.2     # absolute safety margin
+    SMOOTHING = 0.2          # fraction of the way to the target per update
+    LETTER_PAUSE_RANGE = (0.8, 4.0)
+    SPACE_PAUSE_RANGE = (1.5, 8.0)
+    SPACE_OVER_LETTER = 0.5  # SPACE_PAUSE stays at least this much above LETTER_PAUSE
+
+    def __init__(self):
+        self.blink_gaps = deque(maxlen=self.MAX_SAMPLES)
+        self.letter_gaps = deque(maxlen=self.MAX_SAMPLES)
+        self.word_gaps = deque(maxlen=self.MAX_SAMPLES)
+        self.letter_pause = self.DEFAULT_LETTER_PAUSE
+        self.space_pause = self.DEFAULT_SPACE_PAUSE
+        # New samples since the profile was loaded or last saved
+        self.dirty = False
+
+    @staticmethod
+    def _clamp(value, bounds):
+        return min(bounds[1], max(bounds[0], value))
+
+    def _approach(self, current, target):
+        return current + self.SMOOTHING * (target - current)
+
+    def observe_blink_gap(self, seconds):
+        self.blink_gaps.append(seconds)
+        self.dirty = True
+
+    def observe_letter_gap(self, seconds, after_space=False):
+        (self.word_gaps if after_space else self.letter_gaps).append(seconds)
+        self.dirty = True
+
+    def update(self):
+        """Moves the thresholds towards the current estimates. Returns (letter, space) pauses."""
+        if len(self.blink_gaps) >= self.MIN_BLINK_GAPS:
+            target = float(np.percentile(self.blink_gaps, 95)) * self.MARGIN + self.MARGIN_SECONDS
+            self.letter_pause = self._clamp(self._approach(self.letter_pause, target), self.LETTER_PAUSE_RANGE)
+        if len(self.letter_gaps) >= self.MIN_LETTER_GAPS:
+            target = float(np.percentile(self.letter_gaps, 90)) * self.MARGIN + self.MARGIN_SECONDS
+            self.space_pause = self._clamp(self._approach(self.space_pause, target), self.SPACE_PAUSE_RANGE)
+        self.space_pause = max(self.space_pause, self.letter_pause + self.SPACE_OVER_LETTER)
+        return self.letter_pause, self.space_pause
+
+    def to_dict(self):
+        """JSON-friendly state for the user profile."""
+        return {
+            'letter_pause': round(self.letter_pause, 3),
+            'space_pause': round(self.space_pause, 3),
+            'blink_gaps': [round(g, 3) for g in self.blink_gaps],
+            'letter_gaps': [round(g, 3) for g in self.letter_gaps],
+            'word_gaps': [round(g, 3) for g in self.word_gaps]
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        estimator = cls()
+        if data:
+            estimator.blink_gaps.extend(data.get('blink_gaps', []))
+            estimator.letter_gaps.extend(data.get('letter_gaps', []))
+            estimator.word_gaps.extend(data.get('word_gaps', []))
+            estimator.letter_pause = data.get('letter_pause', estimator.letter_pause)
+            estimator.space_pause = data.get('space_pause', estimator.space_pause)
+        return estimator
+
+    def stats(self):
+        def summary(gaps):
+            if not gaps:
+                return None
+            return {'count': len(gaps), 'p50': float(np.percentile(gaps, 50)), 'p95': float(np.percentile(gaps, 95))}
+        return {
+            'letter_pause': self.letter_pause,
+            'space_pause': self.space_pause,
+            'blink_gaps': summary(self.blink_gaps),
+            'letter_gaps': summary(self.letter_gaps),
+            'word_gaps': summary(self.word_gaps)
+        }
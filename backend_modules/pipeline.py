@@ -0,0 +1,37 @@
+def process_frame(session, frame, frame_time):
+    """
+    Runs one frame of a session through blink detection, dot/dash
+    classification and the Morse logic. Blinks are queued on session.ui and
+    go out with the next UI update. Shared by the threaded and asyncio servers.
+    """
+    sid = session.sid
+    communicator = session.communicator
+
+    # 1. Detect Blink (timed by capture time when the client sends one)
+    with session.metrics.timer('detect'):
+        blink_info, current_ear = communicator.blink_detector.detect_blink(frame, frame_time)
+
+    # 2. Logic Flow
+    if blink_info:
+        # Predict Dot vs Dash using the classifier
+        with session.metrics.timer('classify'):
+            blink_type = communicator.classifier.predict(blink_info) # 'dot' or 'dash'
+
+        print(f"[{sid}] Detected: {blink_type} ({blink_info['duration']:.2f}s)")
+
+        # Detection event for Navigation/Game, sent with this tick's UI update
+        session.ui.add_blink(blink_type)
+
+        # Process Morse Logic
+        # Pass the already determined blink_type to avoid re-calculation or errors
+        status, result = communicator.process_blink(blink_info, blink_type, now=blink_info['timestamp'])
+
+        if status == "decoded":
+            print(f"[{sid}] Decoded: {result['char']} (early)")
+
+def decode_pending(session):
+    """Time-based decoding (end of letter/word) on the session's decode clock."""
+    decode_result = session.communicator.handle_time_based_decoding(session.decode_time())
+    if decode_result["status"] in ["decoded", "space_added", "completed"]:
+        print(f"[{session.sid}] Decoded: {decode_result.get('char') or decode_result.get('word') or 'SPACE'}")
+    return decode_result
@@ -0,0 +1,357 @@
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .communicator import MorseCodeCommunicator
+from .frame_codec import decode_frame_packet, FORMAT_GRAY8
+from .frame_ring import FrameRing
+from .metrics import MetricsRegistry, NULL_METRICS
+from .ui_channel import UIChannel
+
+class ProcessingSession:
+    """
+    Processing state owned by a single Socket.IO client (one browser tab).
+    Each session has its own detector state, Morse buffers and classifier.
+    """
+    # Re-sync the client clock mapping if capture times jump by more than this (seconds)
+    CLOCK_RESYNC = 2.0
+    # ...once the jump has lasted this many frames, so a single delay spike doesn't move the mapping
+    CLOCK_RESYNC_FRAMES = 10
+    # Fall back to the wall clock for pauses once frames stop arriving for this long
+    FRAME_STALE = 0.5
+    # Frame buffers per session: latest + being processed + frames being decoded
+    FRAME_SLOTS = 4
+
+    def __init__(self, sid, user_manager=None, detector_options=None, metrics=None, vision_pool=None):
+        self.sid = sid
+        self.communicator = MorseCodeCommunicator(detector_options)
+        self.communicator.user_manager = user_manager
+        if vision_pool is not None:
+            # Detection runs in a worker process that keeps this session's detector state
+            self.communicator.blink_detector = vision_pool.detector(sid, self.communicator.blink_detector)
+        # What this client's UI was last sent (for 'ui_delta' updates)
+        self.ui = UIChannel()
+
+        # Per-session stage timings and frame counters, also fed into the global registry
+        parent = metrics or NULL_METRICS
+        self.metrics = MetricsRegistry({'scope': 'session', 'sid': sid}, parent=metrics, enabled=parent.enabled)
+        self.communicator.blink_detector.metrics = self.metrics
+
+        # Preallocated frame buffers; raw pixels are decoded straight into them, JPEG frames copied in
+        self.frames = FrameRing(self.FRAME_SLOTS)
+        # Header fields of the latest binary frame (None for base64 frames)
+        self.frame_seq = None
+        self.frame_timestamp = None  # capture time mapped onto the server clock
+        self.frame_arrival_time = 0
+        self.clock_offset = None
+        self.clock_jump_frames = 0
+        self.last_mapped_time = 0.0
+        self.processing_active = False
+        self.frame_lock = threading.Lock()
+
+        # Latest-wins handoff: a new frame replaces the published one if it wasn't processed yet
+        self.frames_received = 0
+        self.frames_processed = 0
+        self.frames_dropped = 0    # replaced by a newer frame before being processed
+        self.frames_duplicate = 0  # same sequence number as the frame already held
+        self.frames_stale = 0      # older sequence number (out-of-order delivery)
+        self.frames_no_buffer = 0  # every frame buffer in use (dropped, counted in frames_dropped too)
+
+        # Optional SessionRecorder capturing incoming frames
+        self.recorder = None
+
+        # True while a pool worker is servicing this session
+        self.busy = False
+        self.closed = False
+
+    def to_server_time(self, capture_ms):
+        """
+        Maps a client capture timestamp (ms, client clock) onto the server
+        clock (s). Mapped times never go backwards, since the detector drops
+        frames that are not newer than the last one.
+        """
+        capture = capture_ms / 1000.0
+        offset = time.time() - capture
+        with self.frame_lock:
+            # The smallest offset seen belongs to the least-delayed frame
+            if self.clock_offset is None or offset < self.clock_offset:
+                self.clock_offset = offset
+                self.clock_jump_frames = 0
+            elif offset - self.clock_offset > self.CLOCK_RESYNC:
+                self.clock_jump_frames += 1
+                if self.clock_jump_frames >= self.CLOCK_RESYNC_FRAMES:
+                    self.clock_offset = offset
+                    self.clock_jump_frames = 0
+            else:
+                self.clock_jump_frames = 0
+            mapped = max(capture + self.clock_offset, math.nextafter(self.last_mapped_time, math.inf))
+            self.last_mapped_time = mapped
+            return mapped
+
+    def _acquire_slot(self):
+        with self.frame_lock:
+            slot = self.frames.acquire()
+            if slot is None:
+                self.frames_received += 1
+                self.frames_dropped += 1
+                self.frames_no_buffer += 1
+                self.metrics.inc('frames_received')
+                self.metrics.inc('frames_dropped')
+            return slot
+
+    def _publish(self, slot, seq, timestamp):
+        with self.frame_lock:
+            self.frames_received += 1
+            self.metrics.inc('frames_received')
+            if seq is not None and self.frame_seq is not None:
+                age = (self.frame_seq - seq) % 2**32
+                if age < 2**31:
+                    self.frames.release(slot)
+                    if age == 0:
+                        self.frames_duplicate += 1
+                        self.metrics.inc('frames_duplicate')
+                    else:
+                        self.frames_stale += 1
+                        self.metrics.inc('frames_stale')
+                    return False
+            if self.frames.publish(slot):
+                self.frames_dropped += 1
+                self.metrics.inc('frames_dropped')
+            self.frame_seq = seq
+            self.frame_timestamp = timestamp
+            self.frame_arrival_time = time.time()
+            return True
+
+    def set_frame(self, frame, seq=None, timestamp=None):
+        """
+        Stores an already decoded frame as the newest one, replacing any frame
+        not yet processed. Returns False if the frame was rejected as a
+        duplicate or stale, or no frame buffer was free.
+        """
+        slot = self._acquire_slot()
+        if slot is None:
+            return False
+        self.frames.store(slot, frame)
+        return self._publish(slot, seq, timestamp)
+
+    def decode_packet(self, packet, timestamp=None):
+        """
+        Decodes a binary frame packet into a free frame buffer and publishes it
+        like set_frame. The capture time is mapped onto the server clock unless
+        timestamp (already mapped) is given. Packets that decode are written
+        to the session's recorder, if any. Raises FrameDecodeError.
+        """
+        slot = self._acquire_slot()
+        if slot is None:
+            return False
+        try:
+            header, frame = decode_frame_packet(packet, out=lambda shape: self.frames.buffer(slot, shape))
+        except Exception:
+            with self.frame_lock:
+                self.frames.release(slot)
+            raise
+        # Only after a successful decode, so malformed packets can't break replay
+        recorder = self.recorder
+        if recorder:
+            recorder.write_packet(packet)
+        # JPEG frames come back in a new array; raw pixels were already written into the slot
+        if header['format'] != FORMAT_GRAY8:
+            self.frames.store(slot, frame)
+        if timestamp is None:
+            timestamp = self.to_server_time(header['timestamp'])
+        return self._publish(slot, header['seq'], timestamp)
+
+    def drop_frame(self):
+        """Counts a frame shed before it reached set_frame (async server queue overflow or a failed decode)."""
+        with self.frame_lock:
+            self.frames_received += 1
+            self.frames_dropped += 1
+            self.metrics.inc('frames_received')
+            self.metrics.inc('frames_dropped')
+
+    def has_pending_frame(self):
+        with self.frame_lock:
+            return self.frames.has_latest()
+
+    def take_frame(self):
+        """
+        Returns (frame, capture timestamp) of a frame not processed yet, or
+        (None, None). The frame stays valid, and is not written to, until the
+        next take_frame.
+        """
+        with self.frame_lock:
+            frame = self.frames.take()
+            if frame is None:
+                return None, None
+            self.frames_processed += 1
+            self.metrics.inc('frames_processed')
+            self.metrics.mark('frames_processed')
+            return frame, self.frame_timestamp
+
+    def get_frame_stats(self):
+        with self.frame_lock:
+            return {
+                'received': self.frames_received,
+                'processed': self.frames_processed,
+                'dropped': self.frames_dropped,
+                'duplicate': self.frames_duplicate,
+                'stale': self.frames_stale,
+                'no_buffer': self.frames_no_buffer,
+                'buffer_allocations': self.frames.allocations
+            }
+
+    def decode_time(self):
+        """
+        Clock used for letter/space pauses: the capture time of the latest
+        frame, or the wall clock when frames carry no timestamp or have stopped.
+        """
+        with self.frame_lock:
+            if self.frame_timestamp is None or time.time() - self.frame_arrival_time > self.FRAME_STALE:
+                return time.time()
+            return self.frame_timestamp
+
+    def stop_recording(self):
+        recorder, self.recorder = self.recorder, None
+        if recorder:
+            recorder.close()
+            print(f"Recorded {recorder.frames_written} frames to {recorder.path}")
+
+    def close(self):
+        self.processing_active = False
+        self.closed = True
+        with self.frame_lock:
+            self.frames.clear()
+        self.stop_recording()
+
+    def release(self):
+        """Frees native resources (MediaPipe graph). Called once no worker is using the session."""
+        self.communicator.blink_detector.close()
+
+
+class SessionManager:
+    """
+    Registry of processing sessions keyed by Socket.IO sid.
+    Sessions are serviced by a bounded pool of worker threads so that
+    many clients can share one server without one blocking the others.
+    """
+    def __init__(self, user_manager=None, max_workers=None, detector_options=None, metrics=None, vision_pool=None):
+        self.user_manager = user_manager
+        self.detector_options = detector_options or {}
+        self.metrics = metrics
+        # Optional VisionPool running detection in worker processes
+        self.vision_pool = vision_pool
+        self.sessions = {}
+        self.lock = threading.Lock()
+        # Work items submitted to the pool but not yet started
+        self.queued = 0
+        self.max_workers = max_workers or min(8, os.cpu_count() or 1)
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='session-worker')
+
+    def get(self, sid):
+        with self.lock:
+            return self.sessions.get(sid)
+
+    def get_or_create(self, sid):
+        with self.lock:
+            session = self.sessions.get(sid)
+            if session is None:
+                session = ProcessingSession(sid, self.user_manager, self.detector_options, self.metrics,
+                                            self.vision_pool)
+                self.sessions[sid] = session
+            return session
+
+    def remove(self, sid):
+        with self.lock:
+            session = self.sessions.pop(sid, None)
+            if session is None:
+                return None
+            session.close()
+            in_use = session.busy
+        # A worker still processing this session releases it when it finishes
+        if not in_use:
+            session.release()
+        return session
+
+    def active_sessions(self):
+        with self.lock:
+            return [s for s in self.sessions.values() if s.processing_active]
+
+    def all_sessions(self):
+        with self.lock:
+            return list(self.sessions.values())
+
+    def queue_depth(self):
+        with self.lock:
+            return self.queued
+
+    def submit(self, session, work_fn):
+        """
+        Queues work_fn(session) on the pool unless the session is already being
+        serviced. If a new frame arrives while it runs, the session is queued
+        again behind other sessions rather than holding on to the worker.
+        """
+        with self.lock:
+            if session.busy or session.closed:
+                return False
+            session.busy = True
+            self.queued += 1
+
+        def run():
+            with self.lock:
+                self.queued -= 1
+            try:
+                work_fn(session)
+            except Exception as e:
+                print(f"Session {session.sid} processing error: {e}")
+            finally:
+                with self.lock:
+                    closed = session.closed
+                    requeue = not closed and session.processing_active and session.has_pending_frame()
+                    if requeue:
+                        self.queued += 1
+                    else:
+                        session.busy = False
+                if requeue:
+                    self.executor.submit(run)
+                elif closed:
+                    session.release()
+
+        self.executor.submit(run)
+        return True
+
+    def run(self, session, work_fn):
+        """
+        Runs work_fn(session) on the pool and returns its Future (None if the
+        session is busy or closed). For callers that wait for the result and
+        do their own queueing, like the asyncio server.
+        """
+        with self.lock:
+            if session.busy or session.closed:
+                return None
+            session.busy = True
+
+        def job():
+            try:
+                return work_fn(session)
+            finally:
+                with self.lock:
+                    session.busy = False
+                    closed = session.closed
+                if closed:
+                    session.release()
+
+        return self.executor.submit(job)
+
+    def shutdown(self):
+        with self.lock:
+            sessions = list(self.sessions.values())
+            self.sessions.clear()
+        for session in sessions:
+            session.close()
+        self.executor.shutdown(wait=True)
+        for session in sessions:
+            session.release()
+        if self.vision_pool:
+            self.vision_pool.shutdown()
@@ -0,0 +1,83 @@
+import os
+import struct
+import threading
+import time
+
+from .frame_codec import parse_header, decode_frame_packet, encode_frame_packet
+
+# Recording file layout:
+#   MAGIC
+#   repeated: uint32 packet length (little-endian) + frame packet
+# Each packet is exactly what the client sends on 'frame_bin' (see
+# frame_codec.py), so it already carries the sequence number, capture
+# timestamp and dimensions; JPEG payloads are stored as received.
+MAGIC = b'SVREC\x01'
+LENGTH_FORMAT = '<I'
+LENGTH_SIZE = struct.calcsize(LENGTH_FORMAT)
+
+class SessionRecorder:
+    """Appends incoming frames of one session to a recording file."""
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.file = open(path, 'wb')
+        self.file.write(MAGIC)
+        self.frames_written = 0
+        self.seq = 0
+        # Socket.IO may run frame handlers of one client on several threads
+        self.lock = threading.Lock()
+
+    def write_packet(self, packet):
+        """Records a binary frame packet as received."""
+        with self.lock:
+            self._write(packet)
+
+    def write_frame(self, frame, timestamp=None):
+        """Records a decoded frame (legacy base64 clients), timestamped on arrival."""
+        timestamp = time.time() if timestamp is None else timestamp
+        # Encoded under the lock so sequence numbers are unique and written in order
+        with self.lock:
+            self._write(encode_frame_packet(frame, self.seq, timestamp * 1000.0))
+            self.seq = (self.seq + 1) % 2**32
+
+    def _write(self, packet):
+        if self.file is None:
+            return
+        self.file.write(struct.pack(LENGTH_FORMAT, len(packet)))
+        self.file.write(packet)
+        self.frames_written += 1
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+def read_packets(path):
+    """Yields the raw frame packets of a recording in order."""
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a session recording")
+        while True:
+            prefix = f.read(LENGTH_SIZE)
+            if len(prefix) < LENGTH_SIZE:
+                return
+            (length,) = struct.unpack(LENGTH_FORMAT, prefix)
+            packet = f.read(length)
+            if len(packet) < length:
+                # Truncated tail (server stopped mid-write)
+                return
+            yield packet
+
+def read_recording(path, decode=True):
+    """
+    Yields (header, frame) for every recorded frame. With decode=False the
+    raw packet is yielded in place of the frame, so callers can time decoding.
+    """
+    for packet in read_packets(path):
+        if decode:
+            yield decode_frame_packet(packet)
+        else:
+            yield parse_header(packet), packet
@@ -0,0 +1,92 @@
+import threading
+import time
+
+from .completion import ACCEPT_PATTERN
+
+class UIChannel:
+    """
+    What a session's UI was last sent, so 'ui_delta' updates carry only what
+    changed:
+
+    - message: characters kept from the previous text ('keep') plus the new
+      tail ('append'), tagged with a version; the client asks for a resync
+      when its version doesn't match 'base'.
+    - small fields (sequence, candidates, completions, ...): only when changed.
+    - countdowns: letter/space deadlines on the server clock plus the
+      server's 'now', so the client runs the timers itself.
+    - blinks: dot/dash events since the last update.
+
+    State changes during one processing tick are sent as a single update.
+    Hold 'lock' around build() and the emit so updates leave in order.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version = 0
+        self.message = ""
+        self.fields = {}
+        self.blinks = []
+        self.full = True
+
+    def resync(self):
+        """The next update carries the full state."""
+        with self.lock:
+            self.full = True
+
+    def add_blink(self, blink_type):
+        # Called from the pool worker while build() may run on another thread
+        with self.lock:
+            self.blinks.append(blink_type)
+
+    def build(self, message, fields):
+        """Returns the next 'ui_delta' payload, or None if nothing changed."""
+        payload = {}
+        if self.full:
+            payload['full'] = True
+            payload['keep'] = 0
+            payload['append'] = message
+            payload.update(fields)
+        else:
+            if message != self.message:
+                keep = 0
+                limit = min(len(message), len(self.message))
+                while keep < limit and message[keep] == self.message[keep]:
+                    keep += 1
+                payload['keep'] = keep
+                payload['append'] = message[keep:]
+            for key, value in fields.items():
+                if self.fields.get(key) != value:
+                    payload[key] = value
+        if self.blinks:
+            payload['blinks'] = self.blinks
+            self.blinks = []
+        if not payload:
+            return None
+
+        if 'letter_deadline' in payload or 'space_deadline' in payload:
+            payload['now'] = int(time.time() * 1000)
+        payload['base'] = self.version
+        self.version += 1
+        payload['v'] = self.version
+        self.message = message
+        self.fields = dict(fields)
+        self.full = False
+        return payload
+
+def ui_fields(communicator):
+    """The non-message UI state of a communicator; deadlines are server-clock epoch ms or None."""
+    letter_deadline = None
+    if communicator.current_morse_sequence:
+        letter_deadline = int((communicator.last_blink_time + communicator.LETTER_PAUSE) * 1000)
+    space_deadline = None
+    message = communicator.message_accum
+    if communicator.last_letter_time > 0 and message and not message.endswith(' ') \
+            and not communicator.current_morse_sequence:
+        space_deadline = int((communicator.last_letter_time + communicator.SPACE_PAUSE) * 1000)
+    return {
+        'morse_sequence': communicator.current_morse_sequence,
+        'candidates': list(communicator.morse_decoder.candidates()),
+        'completions': list(communicator.completions),
+        'letter_deadline': letter_deadline,
+        'space_deadline': space_deadline,
+        'accept_pattern': ACCEPT_PATTERN
+    }
@@ -1,19 +1,112 @@
 import os
 import json
+import sqlite3
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 
+from .model_artifact import MODEL_SUFFIX
+
+SCHEMA_VERSION = 1
+
+# Profile fields stored as JSON text
+JSON_FIELDS = ('pause_timing', 'word_history')
+
+def normalize_model_path(path):
+    """Model paths are stored with '/' (profiles created on Windows have 'users\\MG_model')."""
+    return path.replace('\\', '/')
+
 class UserManager:
-    def __init__(self):
-        self.users_dir = "users"
+    """
+    User profiles in a SQLite database (users/users.db) in WAL mode, so the
+    server and Train.py can read and update profiles at the same time.
+    Every update is a single transaction on one row; nothing rewrites the
+    whole store. Each thread gets its own connection.
+
+    The old users/users.json is imported once, when the database is created,
+    and left in place.
+    """
+    def __init__(self, users_dir="users"):
+        self.users_dir = users_dir
         self.users_file = os.path.join(self.users_dir, "users.json")
+        self.db_file = os.path.join(self.users_dir, "users.db")
+        self.local = threading.local()
         self.ensure_directories()
-        self.users = self.load_users()
+        self.init_db()
+        # Callbacks fn(username) run when a user's model changes (trained or deleted)
+        self.listeners = []
 
     def ensure_directories(self):
         if not os.path.exists(self.users_dir):
             os.makedirs(self.users_dir)
 
+    def connection(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            # Waits up to 5s for another process's write instead of failing.
+            # Autocommit: reads don't hold a snapshot open, writes use transaction()
+            conn = sqlite3.connect(self.db_file, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """
+        BEGIN IMMEDIATE takes the write lock up front, so a writer waits for
+        another process's write instead of failing on a stale read snapshot.
+        """
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def query(self, sql, params=()):
+        """All rows of a read, so no statement is left holding a snapshot."""
+        return self.connection().execute(sql, params).fetchall()
+
+    def init_db(self):
+        with self.transaction() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS users (
+                    username TEXT PRIMARY KEY,
+                    created_date TEXT NOT NULL,
+                    model_path TEXT NOT NULL,
+                    trained INTEGER NOT NULL DEFAULT 0,
+                    last_used TEXT,
+                    pause_timing TEXT,
+                    word_history TEXT
+                )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS users_last_used ON users (last_used)")
+            # Checked and set in the same transaction, so only one process migrates
+            if conn.execute("PRAGMA user_version").fetchall()[0][0] < SCHEMA_VERSION:
+                self.migrate_json(conn)
+                conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    def migrate_json(self, conn):
+        """One-time import of users.json into a new database (inside init_db's transaction)."""
+        users = self.load_users()
+        if not users:
+            return
+        rows = []
+        for username, info in users.items():
+            rows.append((username,
+                         info.get('created_date') or datetime.now().isoformat(),
+                         normalize_model_path(info.get('model_path') or self.default_model_path(username)),
+                         int(bool(info.get('trained', False))),
+                         info.get('last_used'),
+                         *[json.dumps(info[f]) if info.get(f) is not None else None for f in JSON_FIELDS]))
+        conn.executemany("INSERT OR IGNORE INTO users (username, created_date, model_path, trained, last_used, "
+                         "pause_timing, word_history) VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        print(f"Migrated {len(rows)} users from {self.users_file} to {self.db_file}")
+
     def load_users(self):
+        """Reads the legacy users.json (used by the migration)."""
         if os.path.exists(self.users_file):
             try:
                 with open(self.users_file, 'r') as f:
@@ -23,47 +116,90 @@ class UserManager:
                 return {}
         return {}
 
-    def save_users(self):
-        try:
-            with open(self.users_file, 'w') as f:
-                json.dump(self.users, f, indent=2)
-        except Exception as e:
-            print(f"Error saving users: {e}")
+    def _update(self, username, column, value):
+        with self.transaction() as conn:
+            return conn.execute(f"UPDATE users SET {column} = ? WHERE username = ?", (value, username)).rowcount > 0
+
+    def default_model_path(self, username):
+        return normalize_model_path(os.path.join(self.users_dir, f"{username}_model"))
 
     def add_user(self, username):
-        if username not in self.users:
-            self.users[username] = {
-                'created_date': datetime.now().isoformat(),
-                'model_path': os.path.join(self.users_dir, f"{username}_model"),
-                'trained': False
-            }
-            self.save_users()
-            return True
-        return False
+        with self.transaction() as conn:
+            return conn.execute("INSERT OR IGNORE INTO users (username, created_date, model_path, trained) "
+                                "VALUES (?, ?, ?, 0)",
+                                (username, datetime.now().isoformat(), self.default_model_path(username))).rowcount > 0
 
     def get_user(self, username):
-        return self.users.get(username)
+        rows = self.query("SELECT created_date, model_path, trained, last_used, pause_timing, word_history "
+                          "FROM users WHERE username = ?", (username,))
+        if not rows:
+            return None
+        created_date, model_path, trained, last_used, *json_values = rows[0]
+        info = {'created_date': created_date, 'model_path': normalize_model_path(model_path), 'trained': bool(trained)}
+        if last_used:
+            info['last_used'] = last_used
+        for field, value in zip(JSON_FIELDS, json_values):
+            if value is not None:
+                info[field] = json.loads(value)
+        return info
+
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+    def notify_model_changed(self, username):
+        for callback in self.listeners:
+            try:
+                callback(username)
+            except Exception as e:
+                print(f"User change listener failed: {e}")
 
     def mark_user_trained(self, username):
-        if username in self.users:
-            self.users[username]['trained'] = True
-            self.save_users()
+        if self._update(username, 'trained', 1):
+            self.notify_model_changed(username)
+
+    def touch_user(self, username):
+        """Records that the user was just selected (used to preload recent profiles)."""
+        self._update(username, 'last_used', datetime.now().isoformat())
+
+    def update_pause_timing(self, username, pause_timing):
+        """Stores the pause timings learned for the user (see PauseTimingEstimator.to_dict)."""
+        self._update(username, 'pause_timing', json.dumps(pause_timing))
+
+    def update_word_history(self, username, word_history):
+        """Stores the user's word counts used for completion."""
+        self._update(username, 'word_history', json.dumps(word_history))
+
+    def recent_users(self, count):
+        """Most recently selected users first."""
+        rows = self.query("SELECT username FROM users WHERE last_used IS NOT NULL ORDER BY last_used DESC LIMIT ?",
+                          (count,))
+        return [username for (username,) in rows]
 
     def list_users(self):
-        return list(self.users.keys())
-    
+        return [username for (username,) in self.query("SELECT username FROM users ORDER BY rowid")]
+
+    def user_summaries(self):
+        """{username: {'trained': bool}} for all users in one query."""
+        rows = self.query("SELECT username, trained FROM users ORDER BY rowid")
+        return {username: {'trained': bool(trained)} for username, trained in rows}
+
     def delete_user_model(self, username):
-        if username in self.users:
-            model_path = self.users[username]['model_path']
+        user_info = self.get_user(username)
+        if user_info:
+            model_path = user_info['model_path']
+            artifact_file = f"{model_path}{MODEL_SUFFIX}"
             model_file = f"{model_path}_model.h5"
             data_file = f"{model_path}_data.pkl"
+            weights_file = f"{model_path}_weights.npz"
             try:
+                if os.path.exists(artifact_file): os.remove(artifact_file)
                 if os.path.exists(model_file): os.remove(model_file)
                 if os.path.exists(data_file): os.remove(data_file)
-                self.users[username]['trained'] = False
-                self.save_users()
+                if os.path.exists(weights_file): os.remove(weights_file)
+                self._update(username, 'trained', 0)
+                self.notify_model_changed(username)
                 return True
             except Exception as e:
                 print(f"Error deleting model: {e}")
                 return False
-        return False
\ No newline at end of file
+        return False
@@ -0,0 +1,327 @@
+import itertools
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .backends import backends
+from .blink_detector import BlinkDetector, DETECTOR_BACKENDS, VISION_BACKENDS
+from .metrics import StageTimer
+
+# Largest frame a slot holds (1080p BGR); bigger frames are sent through the task queue
+SLOT_BYTES = 1920 * 1080 * 3
+# Tracking/backend stats come back with every Nth result of a session
+STATS_EVERY = 30
+# Seconds a frame may take in a worker before the caller gives up on it
+RESULT_TIMEOUT = 5.0
+
+class _StageTimings:
+    """Stands in for a detector's metrics in a worker: keeps one frame's stage timings to send back."""
+    def __init__(self):
+        self.stages = []
+
+    def timer(self, stage):
+        return StageTimer(self, stage)
+
+    def observe(self, stage, seconds):
+        self.stages.append((stage, seconds))
+
+def _worker_main(tasks, results, shm_name, slot_bytes, detector_options):
+    """
+    Worker process: keeps one BlinkDetector per session (sessions are sticky
+    to a worker) and runs frames read straight out of the shared slots.
+    Only EAR, the blink event, the eye landmarks and the stage timings are
+    sent back.
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    backends.warm_up(VISION_BACKENDS)
+    # Frames are only sent once a worker reports that dlib has loaded (or failed to);
+    # MediaPipe keeps loading in the background
+    while not backends.is_settled(*DETECTOR_BACKENDS):
+        time.sleep(0.05)
+    results.put((None, backends.is_ready(*DETECTOR_BACKENDS), None))
+    detectors = {}
+    counts = {}
+    try:
+        while True:
+            task = tasks.get()
+            op = task[0]
+            if op == 'stop':
+                break
+            sid = task[1]
+            if op == 'detect':
+                _, sid, request_id, slot, shape, timestamp, frame = task
+                detector = detectors.get(sid)
+                if detector is None:
+                    detector = detectors[sid] = BlinkDetector(**detector_options)
+                if slot >= 0:
+                    frame = np.ndarray(shape, np.uint8, buffer=shm.buf, offset=slot * slot_bytes)
+                timings = detector.metrics = _StageTimings()
+                try:
+                    blink_info, ear = detector.detect_blink(frame, timestamp)
+                    stats = None
+                    counts[sid] = counts.get(sid, 0) + 1
+                    if counts[sid] % STATS_EVERY == 1:
+                        stats = (detector.get_tracking_stats(), detector.get_backend_stats())
+                    results.put((request_id, (blink_info, ear, detector.last_eye_points, stats, timings.stages), None))
+                except Exception as e:
+                    results.put((request_id, None, repr(e)))
+                del frame
+            elif op == 'reset':
+                if sid in detectors:
+                    detectors[sid].reset()
+            elif op == 'close':
+                detector = detectors.pop(sid, None)
+                counts.pop(sid, None)
+                if detector:
+                    detector.close()
+    finally:
+        for detector in detectors.values():
+            detector.close()
+        try:
+            shm.close()
+        except BufferError:
+            pass
+
+
+class FrameSlots:
+    """
+    Fixed shared-memory frame slots. The server writes a decoded frame into a
+    free slot and the worker reads it in place, so a frame crosses the
+    process boundary without being pickled.
+    """
+    def __init__(self, count, slot_bytes=SLOT_BYTES):
+        self.count = count
+        self.slot_bytes = slot_bytes
+        self.shm = shared_memory.SharedMemory(create=True, size=count * slot_bytes)
+        self.free = queue.Queue()
+        for i in range(count):
+            self.free.put(i)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def acquire(self, frame, timeout=0.05):
+        """Copies frame into a free slot and returns its index, or -1 if it doesn't fit or none is free."""
+        if frame.dtype != np.uint8 or frame.nbytes > self.slot_bytes:
+            return -1
+        try:
+            slot = self.free.get(timeout=timeout)
+        except queue.Empty:
+            return -1
+        view = np.ndarray(frame.shape, np.uint8, buffer=self.shm.buf, offset=slot * self.slot_bytes)
+        np.copyto(view, frame)
+        return slot
+
+    def release(self, slot):
+        if slot >= 0:
+            self.free.put(slot)
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+class VisionPool:
+    """
+    Blink detection in worker processes, so dlib and MediaPipe use more than
+    one core. Each session is pinned to the worker with the fewest sessions
+    and keeps its detector state there. Frames go through FrameSlots; a
+    collector thread matches results to the waiting callers and restarts
+    workers that die (their sessions start over with fresh detectors).
+
+    Processes start on first use, not at import: with the 'spawn' start
+    method every worker imports the server's main module again. The server
+    calls start() when it begins serving and holds frames back until a
+    worker has loaded the detector (is_settled).
+    """
+    def __init__(self, processes, detector_options=None, slots=None, slot_bytes=SLOT_BYTES):
+        self.processes = processes
+        self.detector_options = detector_options or {}
+        self.slot_count = slots or processes * 4
+        self.slot_bytes = slot_bytes
+        self.slots = None
+        self.context = multiprocessing.get_context('spawn')
+        self.workers = []      # (process, task queue) per worker
+        self.results = None
+        self.assigned = {}     # sid -> worker index
+        self.pending = {}      # request id -> (future, slot, worker index)
+        self.request_ids = itertools.count()
+        self.lock = threading.Lock()
+        self.collector = None
+        self.running = False
+        # Set by the first worker whose detector backends finished loading
+        self.settled = threading.Event()
+        self.detector_loaded = False
+
+    def _start_worker(self, index):
+        tasks = self.context.Queue()
+        process = self.context.Process(target=_worker_main, name=f'vision-worker-{index}', daemon=True,
+                                       args=(tasks, self.results, self.slots.name, self.slot_bytes,
+                                             self.detector_options))
+        process.start()
+        return process, tasks
+
+    def start(self):
+        with self.lock:
+            if self.running:
+                return
+            self.slots = FrameSlots(self.slot_count, self.slot_bytes)
+            self.results = self.context.Queue()
+            self.workers = [self._start_worker(i) for i in range(self.processes)]
+            self.running = True
+        self.collector = threading.Thread(target=self._collect, name='vision-collector', daemon=True)
+        self.collector.start()
+        print(f"Vision pool started ({self.processes} processes, {self.slot_count} frame slots)")
+
+    def _collect(self):
+        last_check = time.monotonic()
+        while self.running:
+            if time.monotonic() - last_check > 1.0:
+                self._check_workers()
+                last_check = time.monotonic()
+            try:
+                request_id, result, error = self.results.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                break
+            if request_id is None:
+                # A worker finished warming up; result says whether dlib loaded
+                self.detector_loaded = self.detector_loaded or result
+                self.settled.set()
+                continue
+            with self.lock:
+                entry = self.pending.pop(request_id, None)
+            if entry is None:
+                continue
+            future, slot, _ = entry
+            self.slots.release(slot)
+            if error:
+                future.set_exception(RuntimeError(error))
+            else:
+                future.set_result(result)
+
+    def _check_workers(self):
+        with self.lock:
+            for index, (process, _) in enumerate(self.workers):
+                if process.is_alive() or not self.running:
+                    continue
+                print(f"Vision worker {index} exited ({process.exitcode}); restarting")
+                failed = [rid for rid, entry in self.pending.items() if entry[2] == index]
+                for rid in failed:
+                    future, slot, _ = self.pending.pop(rid)
+                    self.slots.release(slot)
+                    future.set_exception(RuntimeError(f"vision worker {index} exited"))
+                self.workers[index] = self._start_worker(index)
+
+    def is_settled(self):
+        """True once a worker's detector backends have loaded or failed."""
+        return self.settled.is_set()
+
+    def is_ready(self):
+        """True once a worker has the detector loaded."""
+        return self.detector_loaded
+
+    def _worker_for(self, sid):
+        with self.lock:
+            index = self.assigned.get(sid)
+            if index is None:
+                loads = [0] * len(self.workers)
+                for i in self.assigned.values():
+                    loads[i] += 1
+                index = self.assigned[sid] = loads.index(min(loads))
+            return index
+
+    def submit(self, sid, frame, timestamp=None):
+        """Queues a frame of one session; the Future yields (blink_info, ear, eye_points, stats, stage timings)."""
+        self.start()
+        index = self._worker_for(sid)
+        frame = np.ascontiguousarray(frame)
+        slot = self.slots.acquire(frame)
+        future = Future()
+        request_id = next(self.request_ids)
+        with self.lock:
+            self.pending[request_id] = (future, slot, index)
+            tasks = self.workers[index][1]
+        tasks.put(('detect', sid, request_id, slot, frame.shape, timestamp, None if slot >= 0 else frame))
+        return future
+
+    def _send(self, sid, op, forget=False):
+        with self.lock:
+            if not self.running:
+                return
+            index = self.assigned.pop(sid, None) if forget else self.assigned.get(sid)
+            if index is not None:
+                self.workers[index][1].put((op, sid))
+
+    def reset(self, sid):
+        self._send(sid, 'reset')
+
+    def close_session(self, sid):
+        self._send(sid, 'close', forget=True)
+
+    def detector(self, sid, local=None):
+        return RemoteBlinkDetector(self, sid, local)
+
+    def shutdown(self):
+        with self.lock:
+            if not self.running:
+                return
+            self.running = False
+            workers = self.workers
+        for process, tasks in workers:
+            tasks.put(('stop',))
+        for process, _ in workers:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self.slots.close()
+
+
+class RemoteBlinkDetector:
+    """
+    Stands in for a session's BlinkDetector when detection runs in a
+    VisionPool. Tracking and backend stats are the latest ones a worker
+    sent back (they start out as those of the local detector).
+    """
+    def __init__(self, pool, sid, local=None):
+        self.pool = pool
+        self.sid = sid
+        local = local or BlinkDetector(**pool.detector_options)
+        self.tracking_stats = local.get_tracking_stats()
+        self.backend_stats = local.get_backend_stats()
+        self.last_eye_points = None
+        self.last_ear = None
+        self.metrics = local.metrics
+
+    def detect_blink(self, frame, timestamp=None):
+        future = self.pool.submit(self.sid, frame, timestamp)
+        blink_info, ear, eye_points, stats, stages = future.result(timeout=RESULT_TIMEOUT)
+        # Stage timings measured in the worker, so /metrics keeps its per-stage histograms
+        for stage, seconds in stages:
+            self.metrics.observe(stage, seconds)
+        if eye_points is not None:
+            self.last_eye_points = eye_points
+        if stats is not None:
+            self.tracking_stats, self.backend_stats = stats
+        self.last_ear = ear
+        return blink_info, ear
+
+    def get_tracking_stats(self):
+        return self.tracking_stats
+
+    def get_backend_stats(self):
+        return self.backend_stats
+
+    def reset(self):
+        self.last_eye_points = None
+        self.pool.reset(self.sid)
+
+    def close(self):
+        self.pool.close_session(self.sid)
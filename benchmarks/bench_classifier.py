@@ -0,0 +1,77 @@
+"""
+Checks that the NumPy engine reproduces a user's Keras model and compares
+per-call cost of model.predict against the NumPy forward pass.
+
+Usage:
+    python -m benchmarks.bench_classifier users/MG_model [--samples 1000]
+"""
+import argparse
+import os
+import pickle
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from backend_modules.classifier import load_keras_model
+from backend_modules.mlp_engine import NumpyMLP
+from backend_modules.model_artifact import MODEL_SUFFIX, read_model_artifact
+
+
+def random_features(n, rng):
+    duration = rng.uniform(0.05, 1.5, n)
+    intensity = rng.uniform(0.01, 0.1, n)
+    min_ear = rng.uniform(0.1, 0.3, n)
+    return np.column_stack([duration, intensity, min_ear, 1.0 / (duration + 0.001)])
+
+
+def per_call_us(fn, rows):
+    start = time.perf_counter()
+    for row in rows:
+        fn(row[None, :])
+    return (time.perf_counter() - start) / len(rows) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the Keras and NumPy dot/dash classifiers.")
+    parser.add_argument('model_path', help="User model prefix, e.g. users/MG_model")
+    parser.add_argument('--samples', type=int, default=1000)
+    parser.add_argument('--tolerance', type=float, default=1e-5)
+    args = parser.parse_args()
+
+    artifact_path = f"{args.model_path}{MODEL_SUFFIX}"
+    if os.path.exists(artifact_path):
+        artifact = read_model_artifact(artifact_path)
+        scaler = SimpleNamespace(mean_=artifact['scaler_mean'], scale_=artifact['scaler_scale'])
+    else:
+        with open(f"{args.model_path}_data.pkl", 'rb') as f:
+            scaler = pickle.load(f)['scaler']
+    model = load_keras_model(f"{args.model_path}_model.h5")
+    engine = NumpyMLP.from_keras(model, scaler)
+
+    def transform(x):
+        return (x - scaler.mean_) / scaler.scale_
+
+    features = random_features(args.samples, np.random.default_rng(0))
+    keras_out = model.predict(transform(features), verbose=0)[:, 0]
+    numpy_out = engine.predict_proba(features)
+    max_error = float(np.max(np.abs(keras_out - numpy_out)))
+    flips = int(np.sum((keras_out > 0.5) != (numpy_out > 0.5)))
+    print(f"max |keras - numpy| = {max_error:.2e}, decision flips = {flips}/{args.samples}")
+
+    calls = features[:min(200, args.samples)]
+    keras_us = per_call_us(lambda x: model.predict(transform(x), verbose=0), calls)
+    numpy_us = per_call_us(engine.predict_proba, features)
+    start = time.perf_counter()
+    engine.predict_proba(features)
+    batch_us = (time.perf_counter() - start) / args.samples * 1e6
+
+    print(f"keras predict   {keras_us:10.1f} us/call")
+    print(f"numpy engine    {numpy_us:10.1f} us/call")
+    print(f"numpy batched   {batch_us:10.3f} us/sample")
+    if max_error > args.tolerance:
+        raise SystemExit(f"Outputs differ by more than {args.tolerance}")
+
+
+if __name__ == '__main__':
+    main()
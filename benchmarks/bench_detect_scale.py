@@ -0,0 +1,99 @@
+"""
+Accuracy and latency of the detection pyramid: HOG face detection on a
+downscaled frame with landmarks refined at full resolution, for a list of
+fixed scales and 'auto'. Full-resolution detection (scale 1.0) is the
+reference for accuracy.
+
+Per scale: face detection rate, recall against the reference, mean IoU of
+the face boxes, mean eye-landmark error in pixels, mean EAR error, and
+per-frame latency of detection + landmarks.
+
+Usage:
+    python -m benchmarks.bench_detect_scale recording.mp4 [--scales 1.0,0.75,0.5,0.35,auto]
+                                                          [--frames 300] [--redetect-policy always]
+"""
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from backend_modules.blink_detector import BlinkDetector
+from backend_modules.ear_kernel import dlib_eye_points, mean_ear
+from .bench_facemesh import read_frames
+
+
+def run_scale(frames, scale, redetect_policy):
+    """Per-frame (box, eye points, EAR) or None, and latencies in ms."""
+    detector = BlinkDetector(redetect_policy=redetect_policy, detection_scale=scale)
+    detector._ensure_dlib()
+    results = []
+    timings = []
+    scales = []
+    for frame in frames:
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        start = time.perf_counter()
+        face = detector.locate_face(gray)
+        result = None
+        if face is not None:
+            points = dlib_eye_points(detector.predictor(gray, face))
+            result = ((face.left(), face.top(), face.right(), face.bottom()), points, float(mean_ear(points)))
+        timings.append((time.perf_counter() - start) * 1000)
+        scales.append(detector.last_detection_scale)
+        results.append(result)
+    return results, np.array(timings), np.mean(scales)
+
+
+def iou(a, b):
+    x0, y0 = max(a[0], b[0]), max(a[1], b[1])
+    x1, y1 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0, x1 - x0) * max(0, y1 - y0)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def compare(results, reference):
+    """Recall, mean IoU, mean eye-point error (px) and mean |EAR error| over frames both found a face in."""
+    ref_frames = [i for i, r in enumerate(reference) if r is not None]
+    both = [i for i in ref_frames if results[i] is not None]
+    if not both:
+        return 0.0, 0.0, float('nan'), float('nan')
+    recall = len(both) / len(ref_frames)
+    ious = [iou(results[i][0], reference[i][0]) for i in both]
+    point_err = [np.linalg.norm(results[i][1] - reference[i][1], axis=1).mean() for i in both]
+    ear_err = [abs(results[i][2] - reference[i][2]) for i in both]
+    return recall, float(np.mean(ious)), float(np.mean(point_err)), float(np.mean(ear_err))
+
+
+def parse_scale(value):
+    return value if value == BlinkDetector.SCALE_AUTO else float(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HOG detection at several image scales.")
+    parser.add_argument('video', help="Recorded webcam footage (any format OpenCV can read)")
+    parser.add_argument('--frames', type=int, default=300, help="Maximum number of frames to use")
+    parser.add_argument('--scales', default='1.0,0.75,0.5,0.35,auto', help="Comma-separated scales")
+    parser.add_argument('--redetect-policy', default='always',
+                        help="'always' measures detection on every frame; other policies include tracking")
+    args = parser.parse_args()
+
+    frames = read_frames(args.video, args.frames)
+    if not frames:
+        raise SystemExit("No frames read.")
+    print(f"{len(frames)} frames of {frames[0].shape[1]}x{frames[0].shape[0]}, policy {args.redetect_policy}")
+
+    reference, _, _ = run_scale(frames, 1.0, args.redetect_policy)
+    print(f"{'scale':>6} {'used':>6} {'faces':>7} {'recall':>7} {'IoU':>6} {'eye px':>7} {'EAR err':>8} "
+          f"{'mean ms':>8} {'p95 ms':>8}")
+    for value in args.scales.split(','):
+        scale = parse_scale(value.strip())
+        results, timings, used = run_scale(frames, scale, args.redetect_policy)
+        found = sum(1 for r in results if r is not None)
+        recall, mean_iou, point_err, ear_err = compare(results, reference)
+        print(f"{str(scale):>6} {used:6.2f} {found:3d}/{len(frames):<3d} {recall:7.2%} {mean_iou:6.3f} "
+              f"{point_err:7.2f} {ear_err:8.4f} {timings.mean():8.2f} {np.percentile(timings, 95):8.2f}")
+
+
+if __name__ == '__main__':
+    main()
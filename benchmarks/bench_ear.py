@@ -0,0 +1,76 @@
+"""
+Microbenchmark of landmark extraction + EAR: the previous per-eye Python
+path (list comprehension and six scipy euclidean calls per frame) against
+the vectorized kernel, for single frames and stacked batches.
+
+Usage:
+    python -m benchmarks.bench_ear [--frames 10000]
+"""
+import argparse
+import time
+from types import SimpleNamespace
+
+import numpy as np
+from scipy.spatial import distance
+
+from backend_modules.ear_kernel import DLIB_EYE_INDICES, dlib_eye_points, eye_aspect_ratios, mean_ear
+
+
+class FakeShape:
+    """Stands in for dlib.full_object_detection (part(i).x / .y)."""
+    def __init__(self, points):
+        self.points = [SimpleNamespace(x=int(x), y=int(y)) for x, y in points]
+
+    def part(self, i):
+        return self.points[i]
+
+
+def legacy_ear(eye):
+    A = distance.euclidean(eye[1], eye[5])
+    B = distance.euclidean(eye[2], eye[4])
+    C = distance.euclidean(eye[0], eye[3])
+    return 0 if C == 0 else (A + B) / (2.0 * C)
+
+
+def legacy_frame(shape):
+    left = np.array([(shape.part(i).x, shape.part(i).y) for i in range(36, 42)])
+    right = np.array([(shape.part(i).x, shape.part(i).y) for i in range(42, 48)])
+    return (legacy_ear(left) + legacy_ear(right)) / 2.0
+
+
+def kernel_frame(shape):
+    return mean_ear(dlib_eye_points(shape, DLIB_EYE_INDICES))
+
+
+def bench(fn, items):
+    start = time.perf_counter()
+    out = [fn(item) for item in items]
+    return (time.perf_counter() - start) / len(items) * 1e6, np.array(out, dtype=np.float64)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark landmark extraction and EAR computation.")
+    parser.add_argument('--frames', type=int, default=10000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    landmarks = rng.uniform(100, 400, size=(args.frames, 68, 2)).round()
+    shapes = [FakeShape(points) for points in landmarks]
+
+    legacy_us, legacy_out = bench(legacy_frame, shapes)
+    kernel_us, kernel_out = bench(kernel_frame, shapes)
+
+    eyes = landmarks[:, list(DLIB_EYE_INDICES), :]
+    start = time.perf_counter()
+    batch_out = eye_aspect_ratios(eyes).mean(axis=-1)
+    batch_us = (time.perf_counter() - start) / args.frames * 1e6
+
+    print(f"max |legacy - kernel| = {np.max(np.abs(legacy_out - kernel_out)):.2e}")
+    print(f"max |legacy - batch|  = {np.max(np.abs(legacy_out - batch_out)):.2e}")
+    print(f"legacy (scipy, per eye)   {legacy_us:8.2f} us/frame")
+    print(f"kernel (one frame)        {kernel_us:8.2f} us/frame")
+    print(f"kernel (batch of {args.frames})  {batch_us:8.3f} us/frame")
+
+
+if __name__ == '__main__':
+    main()
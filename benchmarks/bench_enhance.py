@@ -0,0 +1,102 @@
+"""
+Cost of the low-light enhancement stage on dark footage: the previous
+full-frame path (gray conversion for the mean, a new CLAHE per frame, a LAB
+round trip and convertScaleAbs) against LowLightEnhancer (subsampled
+brightness, cached CLAHE and tone table, CLAHE on the face region only).
+
+The face region defaults to the central third of the frame; pass --roi to
+use a real face box. --darken scales bright footage down to simulate a dark
+room.
+
+Usage:
+    python -m benchmarks.bench_enhance dark_recording.mp4 [--frames 300] [--roi x,y,w,h] [--darken 0.3]
+"""
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from backend_modules.enhancement import LowLightEnhancer, LEVEL_NONE
+from .bench_facemesh import read_frames
+
+
+def legacy_enhance(frame, history):
+    """The detector's enhancement before the ROI/LUT stage, followed by the gray conversion detection needs."""
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    history.append(np.mean(gray))
+    avg_brightness = np.mean(history[-10:])
+    enhanced = frame
+    if avg_brightness < 80:
+        clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
+        lab = cv2.cvtColor(frame, cv2.COLOR_BGR2LAB)
+        lab[:, :, 0] = clahe.apply(lab[:, :, 0])
+        enhanced = cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
+        if avg_brightness < 50:
+            enhanced = cv2.convertScaleAbs(enhanced, alpha=1.3, beta=25)
+    return cv2.cvtColor(enhanced, cv2.COLOR_BGR2GRAY)
+
+
+def roi_enhance(enhancer, frame, roi):
+    """Per-frame work of the new stage: brightness, gray, search image and the enhanced face crop."""
+    enhancer.measure(frame)
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    enhancer.detection_gray(gray)
+    x, y, w, h = roi
+    return enhancer.enhance_roi(gray[y:y + h, x:x + w])
+
+
+def time_frames(fn, frames):
+    timings = []
+    for frame in frames:
+        start = time.perf_counter()
+        fn(frame)
+        timings.append((time.perf_counter() - start) * 1000)
+    return np.array(timings)
+
+
+def report(name, timings):
+    print(f"{name:<12} mean {timings.mean():7.3f} ms  p50 {np.percentile(timings, 50):7.3f} ms  "
+          f"p95 {np.percentile(timings, 95):7.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark low-light enhancement on recorded footage.")
+    parser.add_argument('video', help="Recorded webcam footage, ideally in a dark room")
+    parser.add_argument('--frames', type=int, default=300, help="Maximum number of frames to use")
+    parser.add_argument('--roi', help="Face box as x,y,w,h (default: central third of the frame)")
+    parser.add_argument('--darken', type=float, default=1.0, help="Multiply pixel values by this factor first")
+    args = parser.parse_args()
+
+    frames = read_frames(args.video, args.frames)
+    if not frames:
+        raise SystemExit("No frames read.")
+    if args.darken != 1.0:
+        frames = [cv2.convertScaleAbs(f, alpha=args.darken) for f in frames]
+    height, width = frames[0].shape[:2]
+    if args.roi:
+        roi = tuple(int(v) for v in args.roi.split(','))
+    else:
+        roi = (width // 3, height // 3, width // 3, height // 3)
+    print(f"{len(frames)} frames of {width}x{height}, face region {roi[2]}x{roi[3]}")
+
+    history = []
+    legacy = time_frames(lambda f: legacy_enhance(f, history), frames)
+    enhancer = LowLightEnhancer()
+    levels = []
+
+    def current_stage(frame):
+        roi_enhance(enhancer, frame, roi)
+        levels.append(enhancer.level)
+
+    current = time_frames(current_stage, frames)
+
+    enhanced = sum(1 for level in levels if level != LEVEL_NONE)
+    print(f"mean brightness {np.mean(history):.1f}, enhanced {enhanced}/{len(frames)} frames")
+    report("full-frame", legacy)
+    report("roi+lut", current)
+    print(f"speedup      {legacy.mean() / max(current.mean(), 1e-9):.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Per-frame cost of the MediaPipe fallback: a FaceMesh graph built for every
+frame (the old behaviour) versus the detector's persistent tracking graph.
+
+Usage:
+    python -m benchmarks.bench_facemesh recording.mp4 [--frames 300]
+"""
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from backend_modules.backends import backends
+from backend_modules.blink_detector import BlinkDetector
+
+
+def read_frames(path, max_frames):
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise SystemExit(f"Could not open video: {path}")
+    frames = []
+    while len(frames) < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def cold_detect(detector, frame):
+    """Old per-frame path: a new FaceMesh graph inside a with block."""
+    with backends.get('mediapipe').solutions.face_mesh.FaceMesh(
+        max_num_faces=1,
+        min_detection_confidence=0.3,
+        min_tracking_confidence=0.3) as face_mesh:
+        rgb_frame = cv2.cvtColor(detector.enhance_frame(frame), cv2.COLOR_BGR2RGB)
+        results = face_mesh.process(rgb_frame)
+        return results.multi_face_landmarks is not None
+
+
+def time_frames(fn, frames):
+    timings = []
+    found = 0
+    for frame in frames:
+        start = time.perf_counter()
+        if fn(frame):
+            found += 1
+        timings.append((time.perf_counter() - start) * 1000)
+    return np.array(timings), found
+
+
+def report(name, timings, found, total):
+    print(f"{name:<12} mean {timings.mean():7.2f} ms  p50 {np.percentile(timings, 50):7.2f} ms  "
+          f"p95 {np.percentile(timings, 95):7.2f} ms  faces {found}/{total}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the MediaPipe FaceMesh fallback on recorded footage.")
+    parser.add_argument('video', help="Recorded webcam footage (any format OpenCV can read)")
+    parser.add_argument('--frames', type=int, default=300, help="Maximum number of frames to use")
+    args = parser.parse_args()
+
+    frames = read_frames(args.video, args.frames)
+    if not frames:
+        raise SystemExit("No frames read.")
+    print(f"{len(frames)} frames of {frames[0].shape[1]}x{frames[0].shape[0]}")
+
+    detector = BlinkDetector()
+    cold, cold_found = time_frames(lambda f: cold_detect(detector, f), frames)
+
+    detector.reset()
+    persistent, persistent_found = time_frames(lambda f: detector.detect_blink_mediapipe(f)[1], frames)
+    detector.close()
+
+    report("per-frame", cold, cold_found, len(frames))
+    report("persistent", persistent, persistent_found, len(frames))
+    print(f"speedup      {cold.mean() / max(persistent.mean(), 1e-9):.1f}x")
+
+
+if __name__ == '__main__':
+    main()
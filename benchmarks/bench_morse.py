@@ -0,0 +1,93 @@
+"""
+Simulated typing throughput of the Morse layer: letters committed only
+after LETTER_PAUSE (the old behaviour) against the streaming trie decoder,
+which commits a letter as soon as its code can't be extended.
+
+A simulated user blinks each symbol, waits for the letter to appear (plus a
+reaction time), and waits for the automatic space between words. The
+communicator runs on a simulated clock, so the result is deterministic.
+
+Usage:
+    python -m benchmarks.bench_morse ["TEXT TO TYPE"] [--dot 0.25] [--dash 0.7] [--gap 0.5] [--reaction 0.3]
+"""
+import argparse
+
+from backend_modules.communicator import MorseCodeCommunicator
+from backend_modules.morse_decoder import MorseCodeDecoder
+
+DEFAULT_TEXTS = [
+    "THE QUICK BROWN FOX JUMPS OVER THE LAZY DOG",
+    "I NEED WATER PLEASE",
+    "CALL ME AT 5 OR 7 PM",
+    "MY ROOM IS 209, FLOOR 3",
+]
+TICK = 0.05
+
+
+class PauseOnlyDecoder(MorseCodeDecoder):
+    """Decodes only when the letter pause expires, like the old dict lookup."""
+    def feed(self, symbol):
+        self.sequence += symbol
+        if self.node is not None:
+            self.node = self.node.children.get(symbol)
+        return None
+
+
+def wait_for(communicator, now, status):
+    """Advances the clock until handle_time_based_decoding reports 'status'."""
+    while True:
+        now += TICK
+        if communicator.handle_time_based_decoding(now)['status'] == status:
+            return now
+
+
+def type_text(text, early_commit, args):
+    communicator = MorseCodeCommunicator()
+    if not early_commit:
+        communicator.morse_decoder = PauseOnlyDecoder()
+    codes = {char: code for code, char in communicator.morse_decoder.morse_code_dict.items()}
+    now = 0.0
+    for w, word in enumerate(text.split()):
+        if w:
+            now = wait_for(communicator, now, 'space_added') + args.reaction
+        for char in word:
+            status = None
+            for symbol in codes[char]:
+                now += args.dot if symbol == '.' else args.dash
+                status, _ = communicator.process_blink({}, 'dot' if symbol == '.' else 'dash', now=now)
+                now += args.gap
+            if status != 'decoded':
+                now = wait_for(communicator, now, 'decoded')
+            now += args.reaction
+    return communicator.message_accum.strip(), now
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate Morse typing throughput with and without early letter commit.")
+    parser.add_argument('texts', nargs='*', help="Texts to type (letters, digits and Morse punctuation)")
+    parser.add_argument('--dot', type=float, default=0.25, help="Dot blink length (s)")
+    parser.add_argument('--dash', type=float, default=0.7, help="Dash blink length (s)")
+    parser.add_argument('--gap', type=float, default=0.5, help="Gap after each blink (s)")
+    parser.add_argument('--reaction', type=float, default=0.3, help="Time to notice a committed letter (s)")
+    args = parser.parse_args()
+
+    print(f"{'text':<44} {'pause wpm':>9} {'trie wpm':>9} {'gain':>6}")
+    totals = [0.0, 0.0]
+    chars = 0
+    for text in args.texts or DEFAULT_TEXTS:
+        text = text.upper()
+        results = [type_text(text, early, args) for early in (False, True)]
+        for decoded, _ in results:
+            if decoded != text:
+                raise SystemExit(f"Decoded {decoded!r}, expected {text!r}")
+        wpm = [len(text) / 5 / (seconds / 60) for _, seconds in results]
+        print(f"{text[:44]:<44} {wpm[0]:9.2f} {wpm[1]:9.2f} {wpm[1] / wpm[0] - 1:6.1%}")
+        totals[0] += results[0][1]
+        totals[1] += results[1][1]
+        chars += len(text)
+    overall = [chars / 5 / (seconds / 60) for seconds in totals]
+    print(f"{'overall':<44} {overall[0]:9.2f} {overall[1]:9.2f} {overall[1] / overall[0] - 1:6.1%}")
+
+
+if __name__ == '__main__':
+    main()
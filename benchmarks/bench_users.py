@@ -0,0 +1,77 @@
+"""
+Profile store cost with many users: the old users.json store (whole file
+rewritten with indent=2 on every update, one get_user per user for /users)
+against the SQLite UserManager, in a temporary directory.
+
+Reports the time of one profile update, one lookup and the /users listing.
+
+Usage:
+    python -m benchmarks.bench_users [--users 5000] [--updates 200]
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from backend_modules.user_manager import UserManager
+
+
+def profile(username, users_dir):
+    return {'created_date': '2025-01-01T00:00:00', 'model_path': os.path.join(users_dir, f"{username}_model"),
+            'trained': False, 'pause_timing': {'letter_pause': 2.0, 'space_pause': 4.0},
+            'word_history': {'HELLO': 3, 'WATER': 1}}
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for i in range(repeat):
+        fn(i)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def bench_json(names, users_dir, args):
+    path = os.path.join(users_dir, 'users.json')
+    users = {name: profile(name, users_dir) for name in names}
+
+    def update(i):
+        users[names[i]]['last_used'] = time.time()
+        with open(path, 'w') as f:
+            json.dump(users, f, indent=2)
+
+    def listing(_):
+        return {u: {'trained': users.get(u, {}).get('trained', False)} for u in list(users)}
+
+    return (timed(update, args.updates), timed(lambda i: users.get(names[i]), args.updates),
+            timed(listing, 20))
+
+
+def bench_sqlite(names, users_dir, args):
+    manager = UserManager(users_dir)
+    with manager.transaction() as conn:
+        conn.executemany("INSERT INTO users (username, created_date, model_path, trained, pause_timing, word_history) "
+                         "VALUES (?, ?, ?, 0, ?, ?)",
+                         [(n, p['created_date'], p['model_path'], json.dumps(p['pause_timing']),
+                           json.dumps(p['word_history'])) for n, p in ((n, profile(n, users_dir)) for n in names)])
+    return (timed(lambda i: manager.touch_user(names[i]), args.updates),
+            timed(lambda i: manager.get_user(names[i]), args.updates),
+            timed(lambda i: manager.user_summaries(), 20))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the JSON and SQLite user profile stores.")
+    parser.add_argument('--users', type=int, default=5000)
+    parser.add_argument('--updates', type=int, default=200)
+    args = parser.parse_args()
+
+    names = [f"user{i:05d}" for i in range(args.users)]
+    print(f"{args.users} profiles")
+    print(f"{'store':<8} {'update ms':>10} {'get ms':>9} {'/users ms':>10}")
+    for label, bench in (('json', bench_json), ('sqlite', bench_sqlite)):
+        with tempfile.TemporaryDirectory() as users_dir:
+            update, get, listing = bench(names, users_dir, args)
+        print(f"{label:<8} {update:10.3f} {get:9.4f} {listing:10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Multi-session detection throughput: every session's frames run through
+BlinkDetector on the server's thread pool (in-process, one GIL) against the
+same work handed to a VisionPool of 1..N worker processes over shared-memory
+frame slots. Sessions replay the same clip, each with its own detector state.
+
+Usage:
+    python -m benchmarks.bench_vision_pool recording.mp4 [--sessions 8] [--processes 1,2,4]
+                                                          [--frames 300] [--threads 8]
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from backend_modules.backends import backends
+from backend_modules.blink_detector import BlinkDetector, DETECTOR_BACKENDS
+from backend_modules.vision_pool import VisionPool
+from .bench_facemesh import read_frames
+
+
+def run_sessions(frames, sessions, threads, make_detector):
+    """Runs each session's frames in order, sessions in parallel; returns frames per second."""
+    def run(sid):
+        detector = make_detector(sid)
+        for frame in frames:
+            detector.detect_blink(frame)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(run, [f'session-{i}' for i in range(sessions)]))
+    return len(frames) * sessions / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare in-process and process-pool blink detection across sessions.")
+    parser.add_argument('video')
+    parser.add_argument('--sessions', type=int, default=8)
+    parser.add_argument('--processes', default=','.join(str(p) for p in (1, 2, 4) if p <= (os.cpu_count() or 1)))
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--threads', type=int, default=8, help="Server worker threads driving the sessions")
+    args = parser.parse_args()
+
+    frames = read_frames(args.video, args.frames)
+    print(f"{len(frames)} frames x {args.sessions} sessions, {args.threads} threads, {os.cpu_count()} cores")
+    for name in DETECTOR_BACKENDS:
+        try:
+            backends.get(name)
+        except RuntimeError as e:
+            print(f"warning: {e}")
+
+    baseline = run_sessions(frames, args.sessions, args.threads, lambda sid: BlinkDetector())
+    print(f"{'mode':<14} {'fps':>9} {'speedup':>8}")
+    print(f"{'in-process':<14} {baseline:9.1f} {1.0:8.2f}")
+    for processes in [int(p) for p in args.processes.split(',')]:
+        pool = VisionPool(processes)
+        try:
+            # One untimed pass per worker loads dlib there
+            run_sessions(frames[:5], processes, processes, lambda sid: pool.detector(sid))
+            fps = run_sessions(frames, args.sessions, args.threads, lambda sid: pool.detector(f'timed-{sid}'))
+        finally:
+            pool.shutdown()
+        print(f"{f'{processes} processes':<14} {fps:9.1f} {fps / baseline:8.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+Load test for a running server (app.py or async_server.py): N simulated
+clients stream binary frames at a fixed rate, and for each client count the
+run reports how much of the offered load was processed and how responsive
+the server stayed.
+
+Per client count: frames sent, processed and dropped (summed over clients),
+processed fps per client, UI updates received, and the round-trip time of a
+small acknowledged event sent alongside the frames (p50/p95), which grows
+when the server's event handling falls behind.
+
+Frames come from a video file when given, otherwise a synthetic grayscale
+frame is sent. Needs aiohttp for the asyncio Socket.IO client.
+
+Usage:
+    python -m benchmarks.load_test [--url http://localhost:5000] [--clients 1,2,4,8,16]
+                                   [--fps 15] [--seconds 10] [--video clip.mp4] [--jpeg]
+"""
+import argparse
+import asyncio
+import time
+
+import cv2
+import numpy as np
+import socketio
+
+from backend_modules.frame_codec import encode_frame_packet, FORMAT_JPEG, FORMAT_GRAY8
+from .bench_facemesh import read_frames
+
+PROBE_INTERVAL = 0.25
+
+
+def make_packets(args):
+    if args.video:
+        frames = read_frames(args.video, max(1, int(args.fps * 4)))
+    else:
+        rng = np.random.default_rng(0)
+        frames = [rng.integers(0, 255, (args.height, args.width), dtype=np.uint8)]
+    if not args.jpeg:
+        frames = [f if f.ndim == 2 else cv2.cvtColor(f, cv2.COLOR_BGR2GRAY) for f in frames]
+    # Header fields are rewritten per send; only the payload is reused
+    return frames, FORMAT_JPEG if args.jpeg else FORMAT_GRAY8
+
+
+async def run_client(url, frames, fmt, args, start_at):
+    client = socketio.AsyncClient(reconnection=False)
+    updates = [0]
+    rtts = []
+
+    @client.on('ui_delta')
+    async def on_ui_delta(data):
+        updates[0] += 1
+
+    await client.connect(url, transports=['websocket'])
+    await client.emit('start_stream')
+    await asyncio.sleep(max(0.0, start_at - time.time()))
+
+    async def probe():
+        while True:
+            sent = time.perf_counter()
+            await client.call('get_stats', timeout=30)
+            rtts.append(time.perf_counter() - sent)
+            await asyncio.sleep(PROBE_INTERVAL)
+
+    prober = asyncio.create_task(probe())
+    interval = 1.0 / args.fps
+    sent = 0
+    begin = time.perf_counter()
+    while time.perf_counter() - begin < args.seconds:
+        packet = encode_frame_packet(frames[sent % len(frames)], seq=sent, timestamp=time.time() * 1000, fmt=fmt)
+        await client.emit('frame_bin', packet)
+        sent += 1
+        await asyncio.sleep(max(0.0, begin + sent * interval - time.perf_counter()))
+    prober.cancel()
+
+    # Let the last queued frames drain before reading the counters
+    await asyncio.sleep(0.5)
+    stats = await client.call('get_stats', timeout=30)
+    await client.emit('stop_stream')
+    await client.disconnect()
+    return {'sent': sent, 'stats': stats, 'updates': updates[0], 'rtts': rtts}
+
+
+async def run_level(url, n, frames, fmt, args):
+    # All clients start streaming at the same moment
+    start_at = time.time() + 1.0
+    return await asyncio.gather(*[run_client(url, frames, fmt, args, start_at) for _ in range(n)])
+
+
+def report(n, results, seconds):
+    sent = sum(r['sent'] for r in results)
+    processed = sum(r['stats'].get('processed', 0) for r in results)
+    dropped = sum(r['stats'].get('dropped', 0) for r in results)
+    updates = sum(r['updates'] for r in results)
+    rtts = np.array([t for r in results for t in r['rtts']]) * 1000
+    p50, p95 = (np.percentile(rtts, 50), np.percentile(rtts, 95)) if rtts.size else (float('nan'),) * 2
+    print(f"{n:>7} {sent:>7} {processed:>9} {dropped:>7} {dropped / max(1, sent):>6.1%} "
+          f"{processed / seconds / n:>10.1f} {updates:>7} {p50:>8.1f} {p95:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream frames from many simulated clients and report how the server scales.")
+    parser.add_argument('--url', default='http://localhost:5000')
+    parser.add_argument('--clients', default='1,2,4,8,16', help="Comma-separated client counts")
+    parser.add_argument('--fps', type=float, default=15)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--video', help="Video file to take frames from (default: synthetic frame)")
+    parser.add_argument('--width', type=int, default=320)
+    parser.add_argument('--height', type=int, default=240)
+    parser.add_argument('--jpeg', action='store_true', help="Send JPEG payloads instead of raw grayscale")
+    args = parser.parse_args()
+
+    frames, fmt = make_packets(args)
+    print(f"{args.fps:g} fps per client for {args.seconds:g}s against {args.url}")
+    print(f"{'clients':>7} {'sent':>7} {'processed':>9} {'dropped':>7} {'drop%':>6} "
+          f"{'fps/client':>10} {'updates':>7} {'rtt p50':>8} {'rtt p95':>8}")
+    for n in [int(c) for c in args.clients.split(',')]:
+        results = asyncio.run(run_level(args.url, n, frames, fmt, args))
+        report(n, results, args.seconds)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+"""
+Replays a recorded session through the full blink pipeline as fast as
+possible (BlinkDetector -> BlinkClassifier -> MorseCodeCommunicator) and
+reports throughput, per-stage latency, the dot/dash decisions and the
+decoded text. With a ground-truth annotation it exits non-zero when the
+result regresses, so it can gate performance changes.
+
+Recordings are written by the server when SILENTVOICE_RECORD_DIR is set.
+
+Annotation file (JSON):
+    {"text": "HELLO", "symbols": ".... . .-.. .-.. ---"}
+"symbols" is optional; letters may be separated by spaces or '/'.
+
+Usage:
+    python -m benchmarks.replay session.svrec [--user MG] [--truth hello.json] [--json]
+"""
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from backend_modules.communicator import MorseCodeCommunicator
+from backend_modules.frame_codec import decode_frame_packet
+from backend_modules.session_recorder import read_packets
+from backend_modules.user_manager import UserManager
+
+STAGES = ['decode', 'detect', 'classify', 'morse']
+
+
+def edit_distance(a, b):
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        for j, cb in enumerate(b, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb)))
+        prev = cur
+    return prev[-1]
+
+
+def replay(path, communicator):
+    timings = {stage: [] for stage in STAGES}
+    decisions = []
+    frames = 0
+    last_time = None
+
+    start = time.perf_counter()
+    for packet in read_packets(path):
+        t0 = time.perf_counter()
+        header, frame = decode_frame_packet(packet)
+        t1 = time.perf_counter()
+        timings['decode'].append(t1 - t0)
+
+        # Replay clock: the recorded capture time of each frame
+        now = header['timestamp'] / 1000.0
+        last_time = now
+        frames += 1
+
+        blink_info, _ = communicator.blink_detector.detect_blink(frame, now)
+        t2 = time.perf_counter()
+        timings['detect'].append(t2 - t1)
+
+        if blink_info:
+            blink_type = communicator.classifier.predict(blink_info)
+            t3 = time.perf_counter()
+            timings['classify'].append(t3 - t2)
+            decisions.append({'time': now, 'duration': blink_info['duration'], 'type': blink_type})
+            communicator.process_blink(blink_info, blink_type, now=now)
+            t2 = t3
+
+        communicator.handle_time_based_decoding(now)
+        timings['morse'].append(time.perf_counter() - t2)
+    elapsed = time.perf_counter() - start
+
+    # Flush a letter still waiting for its pause at the end of the recording
+    if last_time is not None:
+        communicator.handle_time_based_decoding(last_time + communicator.LETTER_PAUSE + 0.001)
+
+    return {
+        'frames': frames,
+        'seconds': elapsed,
+        'fps': frames / elapsed if elapsed > 0 else 0.0,
+        'latency_ms': {
+            stage: {
+                'count': len(values),
+                'p50': float(np.percentile(values, 50) * 1000),
+                'p95': float(np.percentile(values, 95) * 1000),
+                'p99': float(np.percentile(values, 99) * 1000),
+            } for stage, values in timings.items() if values
+        },
+        'blinks': len(decisions),
+        'decisions': decisions,
+        'symbols': ''.join('.' if d['type'] == 'dot' else '-' for d in decisions),
+        'text': communicator.message_accum.strip(),
+        'tracking': communicator.blink_detector.get_tracking_stats(),
+        'face_backends': communicator.blink_detector.get_backend_stats(),
+    }
+
+
+def compare(report, truth):
+    result = {}
+    if 'text' in truth:
+        expected = truth['text'].strip().upper()
+        distance = edit_distance(report['text'], expected)
+        result['text_expected'] = expected
+        result['text_match'] = report['text'] == expected
+        result['cer'] = distance / max(len(expected), 1)
+    if 'symbols' in truth:
+        expected = ''.join(c for c in truth['symbols'] if c in '.-')
+        distance = edit_distance(report['symbols'], expected)
+        result['symbols_expected'] = expected
+        result['symbol_accuracy'] = 1.0 - distance / max(len(expected), 1)
+    return result
+
+
+def print_report(report):
+    print(f"Frames:   {report['frames']} in {report['seconds']:.2f}s ({report['fps']:.1f} fps)")
+    print("Latency (ms):")
+    for stage, stats in report['latency_ms'].items():
+        print(f"  {stage:<9} n={stats['count']:<6} p50 {stats['p50']:7.2f}  p95 {stats['p95']:7.2f}  p99 {stats['p99']:7.2f}")
+    print(f"Tracking: {report['tracking']}")
+    print(f"Backends: {report['face_backends']}")
+    print(f"Blinks:   {report['blinks']}")
+    for d in report['decisions']:
+        print(f"  {d['time']:.3f}  {d['duration']:.3f}s  {d['type']}")
+    print(f"Symbols:  {report['symbols']}")
+    print(f"Text:     {report['text']!r}")
+    if 'truth' in report:
+        truth = report['truth']
+        if 'text_expected' in truth:
+            print(f"Expected: {truth['text_expected']!r}  match={truth['text_match']}  CER={truth['cer']:.3f}")
+        if 'symbols_expected' in truth:
+            print(f"Symbols expected: {truth['symbols_expected']}  accuracy={truth['symbol_accuracy']:.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded session through the blink pipeline.")
+    parser.add_argument('recording', help="Recording written with SILENTVOICE_RECORD_DIR (.svrec)")
+    parser.add_argument('--user', help="Load this user's trained classifier")
+    parser.add_argument('--truth', help="Ground-truth annotation JSON")
+    parser.add_argument('--max-cer', type=float, default=0.0, help="Highest character error rate that still passes")
+    parser.add_argument('--redetect-policy', default='hybrid', help="Face re-detect policy (always/interval/confidence/hybrid)")
+    parser.add_argument('--redetect-interval', type=int, default=10)
+    parser.add_argument('--detection-scale', default='auto', help="HOG detection scale: 'auto' or a factor such as 0.5")
+    parser.add_argument('--json', action='store_true', help="Print the report as JSON")
+    args = parser.parse_args()
+
+    communicator = MorseCodeCommunicator({
+        'redetect_policy': args.redetect_policy,
+        'redetect_interval': args.redetect_interval,
+        'detection_scale': args.detection_scale,
+    })
+    if args.user:
+        user_info = UserManager().get_user(args.user)
+        if not user_info:
+            raise SystemExit(f"User not found: {args.user}")
+        communicator.current_user = args.user
+        if not communicator.load_user_profile(user_info):
+            print(f"User {args.user} is not trained, using the duration threshold.", file=sys.stderr)
+
+    report = replay(args.recording, communicator)
+    communicator.blink_detector.close()
+
+    passed = True
+    if args.truth:
+        with open(args.truth) as f:
+            report['truth'] = compare(report, json.load(f))
+        passed = report['truth'].get('cer', 0.0) <= args.max_cer
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == '__main__':
+    main()
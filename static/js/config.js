@@ -8,7 +8,13 @@ export const state = {
     currentMode: 'idle', // 'idle', 'navigation', 'morse_input'
     communicationStartTime: null,
     timerInterval: null,
-    frameSendingInterval: null
+    frameSendingInterval: null,
+    frameTransport: 'jpeg', // 'jpeg' | 'gray' (binary 'frame_bin' event) or 'base64' (legacy 'frame' event)
+    frameSeq: 0,
+    frameEncoding: false,
+    // UI state rebuilt from 'ui_delta' updates
+    ui: { version: 0, message: '', letterDeadline: null, spaceDeadline: null },
+    countdownInterval: null
 };
 
 // DOM Elements cache (populated in main.js)
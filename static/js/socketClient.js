@@ -1,6 +1,6 @@
 import { state } from './config.js';
 import { moveHighlight, selectHighlightedElement } from './navigation.js';
-import { updateStatus, updateMessageDisplay, updateTimerDisplay } from './ui.js';
+import { updateStatus, updateMessageDisplay, updateCountdowns } from './ui.js';
 import { stopCommunication } from './main.js'; // Circular dependency handled by function reference
 import { handleGameBlink } from './game.js';
 
@@ -11,6 +11,8 @@ export function setupSocketEvents() {
 
     state.socket.on('connect', () => {
         console.log('Connected to server.');
+        // A new server session starts with a full update
+        resetUiState();
         if (state.currentMode !== 'idle') {
             state.socket.emit('set_mode', { mode: state.currentMode });
         }
@@ -21,21 +23,12 @@ export function setupSocketEvents() {
         stopCommunication();
     });
 
-    state.socket.on('blink_detected', (data) => {
-        // Route blink events based on page/mode
-        if (document.body.classList.contains('flappy-bird-page')) {
-            handleGameBlink(data.type);
-        } else if (state.currentMode === 'navigation') {
-            if (data.type === 'dot') moveHighlight(1);
-            else if (data.type === 'dash') selectHighlightedElement();
-        }
-    });
+    state.socket.on('ui_delta', applyUiDelta);
 
-    state.socket.on('update_ui', (data) => {
-        updateMessageDisplay(data);
-        updateStatus(data.status);
-        updateTimerDisplay();
-    });
+    // Countdowns run locally from the deadlines in the last update
+    if (!state.countdownInterval) {
+        state.countdownInterval = setInterval(updateCountdowns, 100);
+    }
 
     state.socket.on('status', (data) => {
         updateStatus(data.message);
@@ -43,4 +36,51 @@ export function setupSocketEvents() {
             stopCommunication();
         }
     });
-}
\ No newline at end of file
+}
+
+function handleBlink(type) {
+    // Route blink events based on page/mode
+    if (document.body.classList.contains('flappy-bird-page')) {
+        handleGameBlink(type);
+    } else if (state.currentMode === 'navigation') {
+        if (type === 'dot') moveHighlight(1);
+        else if (type === 'dash') selectHighlightedElement();
+    }
+}
+
+function resetUiState() {
+    state.ui = { version: 0, message: '', letterDeadline: null, spaceDeadline: null };
+}
+
+// Server clock deadline (epoch ms) -> local Date.now() deadline
+function toLocalDeadline(deadline, serverNow) {
+    return deadline === null ? null : Date.now() + (deadline - serverNow);
+}
+
+function applyUiDelta(data) {
+    // Blinks are events: act on them even if the text state needs a resync
+    (data.blinks || []).forEach(handleBlink);
+
+    if (!data.full && data.base !== state.ui.version) {
+        state.socket.emit('ui_resync');
+        return;
+    }
+    const ui = state.ui;
+    if (data.append !== undefined) {
+        ui.message = ui.message.slice(0, data.keep) + data.append;
+    }
+    for (const key of ['morse_sequence', 'candidates', 'completions', 'accept_pattern']) {
+        if (data[key] !== undefined) ui[key] = data[key];
+    }
+    if (data.letter_deadline !== undefined) ui.letterDeadline = toLocalDeadline(data.letter_deadline, data.now);
+    if (data.space_deadline !== undefined) ui.spaceDeadline = toLocalDeadline(data.space_deadline, data.now);
+    ui.version = data.v;
+
+    if (data.append !== undefined || data.morse_sequence !== undefined) {
+        updateMessageDisplay(ui);
+        updateStatus('Processing');
+    } else if (data.candidates !== undefined || data.completions !== undefined) {
+        updateMessageDisplay(ui);
+    }
+    updateCountdowns();
+}
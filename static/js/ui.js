@@ -35,8 +35,7 @@ export function updateMessageDisplay(data) {
     const msgDisplay = document.getElementById('messageDisplay');
     const seqDisplay = document.getElementById('morseSequenceDisplay');
     const progressBar = document.getElementById('cooldownProgressBar');
-    const letterTimer = document.getElementById('letterTimerInfo');
-    const spaceTimer = document.getElementById('spaceTimerInfo');
+    const completionsDisplay = document.getElementById('completionsDisplay');
 
     // Update Message Text
     if (msgDisplay) {
@@ -52,7 +51,19 @@ export function updateMessageDisplay(data) {
 
     // Update Morse Sequence (dots/dashes)
     if (seqDisplay) {
-        seqDisplay.textContent = `Current: ${state.currentMode === 'morse_input' ? (data.morse_sequence || '') : ''}`;
+        let current = state.currentMode === 'morse_input' ? (data.morse_sequence || '') : '';
+        // Show what the sequence can still turn into
+        if (current && data.candidates && data.candidates.length) {
+            current += `  (${data.candidates.slice(0, 8).join(' ')}${data.candidates.length > 8 ? ' …' : ''})`;
+        }
+        seqDisplay.textContent = `Current: ${current}`;
+    }
+
+    // Word completions for the partial word
+    if (completionsDisplay) {
+        completionsDisplay.textContent = (data.completions && data.completions.length)
+            ? `Suggestions: ${data.completions.join(' · ')}  (${data.accept_pattern} takes ${data.completions[0]})`
+            : '';
     }
 
     // Update Visual Progress Bar
@@ -64,10 +75,19 @@ export function updateMessageDisplay(data) {
             progressBar.style.width = '0%';
         }
     }
+}
+
+// Letter/space countdowns from the local deadlines in state.ui (called on a short interval)
+export function updateCountdowns() {
+    const letterTimer = document.getElementById('letterTimerInfo');
+    const spaceTimer = document.getElementById('spaceTimerInfo');
+    const now = Date.now();
+    const remaining = (deadline) => (deadline === null ? 0 : Math.max(0, (deadline - now) / 1000));
+    const letterIn = remaining(state.ui.letterDeadline);
+    const spaceIn = remaining(state.ui.spaceDeadline);
 
-    // Update Timers for next letter/space
-    if (letterTimer) letterTimer.textContent = (data.letter_timer > 0) ? `Letter in: ${data.letter_timer.toFixed(1)}s` : '';
-    if (spaceTimer) spaceTimer.textContent = (data.space_timer > 0) ? `Space in: ${data.space_timer.toFixed(1)}s` : '';
+    if (letterTimer) letterTimer.textContent = (letterIn > 0) ? `Letter in: ${letterIn.toFixed(1)}s` : '';
+    if (spaceTimer) spaceTimer.textContent = (spaceIn > 0) ? `Space in: ${spaceIn.toFixed(1)}s` : '';
 }
 
 // --- User Management Logic ---
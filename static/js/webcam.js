@@ -37,12 +37,84 @@ export function startSendingFrames() {
             clearInterval(state.frameSendingInterval);
             return;
         }
+        // Skip this tick if the previous frame is still being encoded
+        if (state.frameEncoding || !state.socket) return;
+
         state.ctx.drawImage(state.video, 0, 0, state.canvas.width, state.canvas.height);
-        const frameData = state.canvas.toDataURL('image/jpeg', 0.5);
-        if(state.socket) state.socket.emit('frame', { image: frameData });
+        const captureTime = performance.timeOrigin + performance.now();
+
+        if (state.frameTransport === 'base64' || !state.canvas.toBlob) {
+            const frameData = state.canvas.toDataURL('image/jpeg', 0.5);
+            state.socket.emit('frame', { image: frameData });
+        } else if (state.frameTransport === 'gray') {
+            sendGrayFrame(captureTime);
+        } else {
+            sendJpegFrame(captureTime);
+        }
     }, 100);
 }
 
+// --- Binary frame packets ('frame_bin') ---
+// Header layout must match backend_modules/frame_codec.py
+const PACKET_VERSION = 1;
+const HEADER_SIZE = 20;
+const FORMAT_JPEG = 0;
+const FORMAT_GRAY8 = 1;
+const GRAY_FRAME_WIDTH = 320;
+
+function buildPacket(format, width, height, captureTime, payload) {
+    const packet = new Uint8Array(HEADER_SIZE + payload.byteLength);
+    const view = new DataView(packet.buffer);
+    view.setUint8(0, PACKET_VERSION);
+    view.setUint8(1, format);
+    view.setUint16(2, width, true);
+    view.setUint16(4, height, true);
+    view.setUint16(6, 0, true);
+    view.setUint32(8, state.frameSeq, true);
+    view.setFloat64(12, captureTime, true);
+    packet.set(payload, HEADER_SIZE);
+    state.frameSeq = (state.frameSeq + 1) >>> 0;
+    return packet.buffer;
+}
+
+function sendJpegFrame(captureTime) {
+    const { width, height } = state.canvas;
+    state.frameEncoding = true;
+    state.canvas.toBlob(blob => {
+        if (!blob) {
+            state.frameEncoding = false;
+            return;
+        }
+        blob.arrayBuffer().then(buf => {
+            if (state.socket) {
+                state.socket.emit('frame_bin', buildPacket(FORMAT_JPEG, width, height, captureTime, new Uint8Array(buf)));
+            }
+        }).finally(() => { state.frameEncoding = false; });
+    }, 'image/jpeg', 0.5);
+}
+
+function sendGrayFrame(captureTime) {
+    if (!state.grayCanvas) {
+        state.grayCanvas = document.createElement('canvas');
+        state.grayCtx = state.grayCanvas.getContext('2d', { willReadFrequently: true });
+    }
+    const scale = Math.min(1, GRAY_FRAME_WIDTH / state.canvas.width);
+    const width = Math.round(state.canvas.width * scale);
+    const height = Math.round(state.canvas.height * scale);
+    if (state.grayCanvas.width !== width || state.grayCanvas.height !== height) {
+        state.grayCanvas.width = width;
+        state.grayCanvas.height = height;
+    }
+    state.grayCtx.drawImage(state.canvas, 0, 0, width, height);
+    const rgba = state.grayCtx.getImageData(0, 0, width, height).data;
+    const gray = new Uint8Array(width * height);
+    for (let i = 0, j = 0; j < gray.length; i += 4, j++) {
+        // ITU-R BT.601 luma, same weights as cv2.COLOR_BGR2GRAY
+        gray[j] = (rgba[i] * 77 + rgba[i + 1] * 150 + rgba[i + 2] * 29) >> 8;
+    }
+    state.socket.emit('frame_bin', buildPacket(FORMAT_GRAY8, width, height, captureTime, gray));
+}
+
 export function stopWebcam() {
     if (state.frameSendingInterval) {
         clearInterval(state.frameSendingInterval);